@@ -0,0 +1 @@
+"""Wordbook ベンチマーク"""
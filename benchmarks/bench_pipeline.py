@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+データ処理のホットパスのマイクロベンチマーク
+
+合成データを複数のサイズで計測し、benchmarks/baselines.jsonの基準値と
+比較する。基準値より許容率を超えて遅くなったベンチマークがあれば終了
+コード1で終了する。
+
+マシンの速度や負荷の違いを打ち消すため、固定の校正処理と交互に計測し、
+その何倍かかったか（相対値、繰り返しごとの比の中央値）で基準値と比較する。
+校正処理はホットパスと同じく入れ子のdict・listをたどる処理で、作業領域の
+大きさも揃えている。
+
+    python -m benchmarks.bench_pipeline                     # 基準値と比較
+    python -m benchmarks.bench_pipeline --update-baselines  # 基準値を更新
+    python -m benchmarks.bench_pipeline --filter parse      # 一部のみ実行
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import timeit
+from pathlib import Path
+
+from benchmarks.synthetic import STATUSES, make_rich_text, make_word_pages
+
+BASELINES_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+# 計測するデータサイズ（件数）
+SIZES = (1000, 10000)
+
+# 校正処理がたどる行数
+CALIBRATION_ROWS = 10000
+
+
+def bench_parse_pages(size):
+    """Wordsデータベースのページのプロパティ解析"""
+    from src.wordbook.records import parse_word_page
+
+    pages = make_word_pages(size)
+    return lambda: [parse_word_page(page) for page in pages]
+
+
+def bench_join_plain_text(size):
+    """rich_text配列のplain_text連結"""
+    from src.wordbook.records import join_plain_text
+
+    arrays = [make_rich_text(f"sentence number {i} " * 4, chunks=4)
+              for i in range(size)]
+    return lambda: [join_plain_text(array) for array in arrays]
+
+
+def bench_build_dataframe(size):
+    """DataFrameの作成とソート"""
+    from src.wordbook.records import parse_word_page, records_to_dataframe
+
+    records = [parse_word_page(page) for page in make_word_pages(size)]
+    return lambda: records_to_dataframe(records).sort_values(['Section'])
+
+
+def bench_option_labels(size):
+    """単語選択肢ラベルの作成"""
+    from src.wordbook.records import parse_word_page, records_to_dataframe
+    from streamlit_app import build_word_options
+
+    records = [parse_word_page(page) for page in make_word_pages(size)]
+    sorted_df = records_to_dataframe(records).sort_values(['Section'])
+    return lambda: build_word_options(sorted_df)
+
+
+def bench_status_emoji(size):
+    """get_status_emoji"""
+    from streamlit_app import get_status_emoji
+
+    rng = random.Random(0)
+    statuses = [rng.choice(STATUSES + [None, '']) for _ in range(size)]
+    return lambda: [get_status_emoji(status) for status in statuses]
+
+
+def bench_get_text(size):
+    """i18n.get_textの参照"""
+    from src.wordbook.i18n import get_text, load_catalog
+
+    rng = random.Random(0)
+    keys = list(load_catalog('en'))
+    lookups = [(rng.choice(keys), rng.choice(['en', 'ja']))
+               for _ in range(size)]
+    return lambda: [get_text(key, lang) for key, lang in lookups]
+
+
+def bench_text_bundle(size):
+    """言語ごとのTextBundleの参照（テキストとステータスのラベル）"""
+    from src.wordbook.i18n import get_bundle, load_catalog
+
+    rng = random.Random(0)
+    keys = list(load_catalog('en'))
+    lookups = [(rng.choice(keys), rng.choice(STATUSES + [None]),
+                rng.choice(['en', 'ja']))
+               for _ in range(size)]
+    return lambda: [(get_bundle(lang)[key],
+                     get_bundle(lang).status_label(status))
+                    for key, status, lang in lookups]
+
+
+BENCHMARKS = {
+    'parse_pages': bench_parse_pages,
+    'join_plain_text': bench_join_plain_text,
+    'build_dataframe': bench_build_dataframe,
+    'option_labels': bench_option_labels,
+    'status_emoji': bench_status_emoji,
+    'get_text': bench_get_text,
+    'text_bundle': bench_text_bundle,
+}
+
+
+def make_calibration():
+    """校正用の固定の純Python処理を作成
+
+    ページのプロパティ解析と同じく、入れ子のdict・listをたどって文字列を
+    連結する。キャッシュに収まる小さな処理で校正すると、大きなデータの
+    ベンチマークだけが負荷の影響を受けて相対値がぶれる。
+    """
+    rows = [{'id': i,
+             'properties': {
+                 'name': {'type': 'title',
+                          'title': [{'plain_text': f"row{i}"},
+                                    {'plain_text': f" part {i % 13}"}]},
+                 'rank': {'type': 'number', 'number': i % 97},
+             }}
+            for i in range(CALIBRATION_ROWS)]
+
+    def calibration():
+        return [(''.join(part['plain_text']
+                         for part in row['properties']['name']['title']),
+                 row['properties']['rank']['number'])
+                for row in rows]
+    return calibration
+
+
+def measure(func, calibration, repeat):
+    """1回の呼び出しにかかる時間（秒）と校正処理に対する相対値
+
+    校正処理と交互にrepeat回計測する。時間は最小値、相対値は同じ回の
+    校正処理との比の中央値（計測中に負荷が変わっても打ち消される）。
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    calibration_timer = timeit.Timer(calibration)
+    calibration_number, _ = calibration_timer.autorange()
+
+    seconds = []
+    ratios = []
+    for _ in range(repeat):
+        unit = calibration_timer.timeit(calibration_number)
+        elapsed = timer.timeit(number) / number
+        seconds.append(elapsed)
+        ratios.append(elapsed / (unit / calibration_number))
+    return min(seconds), statistics.median(ratios)
+
+
+def load_baselines():
+    """保存済みの基準値を読み込む"""
+    if not BASELINES_PATH.exists():
+        return {}
+    with open(BASELINES_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(baselines):
+    """基準値を保存"""
+    with open(BASELINES_PATH, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    """ベンチマークを実行して基準値と比較"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--update-baselines', action='store_true',
+                        help='計測結果で基準値を上書き')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='許容する低速化の割合（0.5 = 50%%）')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='計測の繰り返し回数')
+    parser.add_argument('--filter', default='',
+                        help='名前にこの文字列を含むベンチマークのみ実行')
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines()
+    calibration = make_calibration()
+    results = {}
+    regressions = []
+
+    print(f"{'benchmark':<28} {'ms/op':>10} {'relative':>10} "
+          f"{'baseline':>10} {'ratio':>7}")
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        for size in SIZES:
+            key = f"{name}[{size}]"
+            func = setup(size)
+            seconds, relative = measure(func, calibration, args.repeat)
+            results[key] = relative
+
+            baseline = baselines.get(key)
+            if baseline:
+                ratio = relative / baseline
+                mark = ''
+                if ratio > 1 + args.tolerance:
+                    regressions.append(key)
+                    mark = '  REGRESSION'
+                print(f"{key:<28} {seconds * 1000:>10.3f} {relative:>10.2f} "
+                      f"{baseline:>10.2f} {ratio:>6.2f}x{mark}")
+            else:
+                print(f"{key:<28} {seconds * 1000:>10.3f} {relative:>10.2f} "
+                      f"{'-':>10} {'-':>7}")
+
+    if args.update_baselines:
+        baselines.update(results)
+        save_baselines(baselines)
+        print(f"baselines written to {BASELINES_PATH}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over "
+              f"{args.tolerance:.0%} tolerance: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
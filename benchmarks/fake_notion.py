@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク・負荷試験用のNotionクライアントの代替（ローカル・インメモリ）
+"""
+
+import asyncio
+import copy
+import threading
+import time
+from unittest import mock
+
+from benchmarks.synthetic import make_word_pages
+
+
+class FakeEndpoint:
+    """notion_client.Clientのエンドポイントを模したオブジェクト"""
+
+    def __init__(self, client):
+        self.client = client
+
+
+class FakeDatabases(FakeEndpoint):
+    """databases エンドポイント"""
+
+    def query(self, database_id, page_size=100, start_cursor=None, **kwargs):
+        """ページ単位でページ一覧を返す"""
+        self.client.wait()
+        with self.client.lock:
+            pages = self.client.pages_by_db.get(database_id, [])
+            start = int(start_cursor or 0)
+            end = start + page_size
+            results = copy.deepcopy(pages[start:end])
+        return {
+            'object': 'list',
+            'results': results,
+            'has_more': end < len(pages),
+            'next_cursor': str(end) if end < len(pages) else None,
+        }
+
+
+class FakePages(FakeEndpoint):
+    """pages エンドポイント"""
+
+    def retrieve(self, page_id, **kwargs):
+        """ページを1件返す"""
+        self.client.wait()
+        with self.client.lock:
+            return copy.deepcopy(self.client.find_page(page_id))
+
+    def update(self, page_id, properties, **kwargs):
+        """Statusプロパティを更新"""
+        self.client.wait()
+        with self.client.lock:
+            page = self.client.find_page(page_id)
+            for prop_name, prop_value in properties.items():
+                if 'status' in prop_value:
+                    page['properties'][prop_name] = {
+                        'type': 'status',
+                        'status': dict(prop_value['status'])
+                    }
+            self.client.update_count += 1
+            return copy.deepcopy(page)
+
+
+class FakeNotionClient:
+    """合成データを返すNotionクライアント
+
+    latency秒の待ち時間を各API呼び出しに入れてネットワークを模擬する。
+    """
+
+    def __init__(self, pages_by_db, latency=0.0):
+        self.pages_by_db = pages_by_db
+        self.page_index = {page['id']: page
+                           for pages in pages_by_db.values()
+                           for page in pages}
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.update_count = 0
+        self.databases = FakeDatabases(self)
+        self.pages = FakePages(self)
+
+    def wait(self):
+        """ネットワーク待ちを模擬"""
+        if self.latency:
+            time.sleep(self.latency)
+
+    def find_page(self, page_id):
+        """IDでページを探す"""
+        return self.page_index[page_id]
+
+
+class FakeAsyncEndpoint:
+    """同期の代替エンドポイントをコルーチンとして呼び出せるようにする"""
+
+    def __init__(self, endpoint, latency):
+        self.endpoint = endpoint
+        self.latency = latency
+
+    def __getattr__(self, name):
+        func = getattr(self.endpoint, name)
+
+        async def call(**kwargs):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return func(**kwargs)
+
+        return call
+
+
+class FakeAsyncNotionClient:
+    """notion_client.AsyncClientの代替
+
+    FakeNotionClientのデータを共有し、latency秒の待ち時間をasyncio.sleepで
+    模擬する（待ちの間に他のリクエストが進む）。
+    """
+
+    def __init__(self, client, latency=0.0):
+        self.client = client
+        self.databases = FakeAsyncEndpoint(client.databases, latency)
+        self.pages = FakeAsyncEndpoint(client.pages, latency)
+
+
+def patch_notion(word_count, latency=0.0, seed=0):
+    """アプリのNotionクライアントを代替に差し替えるパッチを作成
+
+    設定された各ワークブックのWordsデータベースにword_count件の合成ページを
+    入れる。アプリは非同期データ層のファサード越しに呼び出すため、
+    AsyncClientを差し替える（待ち時間はasyncio.sleepで模擬する）。
+    """
+    from src.wordbook import async_notion
+    from src.wordbook.workbooks import load_workbooks
+
+    fake = FakeNotionClient(
+        {workbook.words_db_id: make_word_pages(word_count, seed=seed + i)
+         for i, workbook in enumerate(load_workbooks().values())}
+    )
+    return fake, mock.patch.object(
+        async_notion, 'AsyncClient',
+        lambda auth=None, **options: FakeAsyncNotionClient(fake, latency))
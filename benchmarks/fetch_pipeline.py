@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Wordsデータベース取得のモード別比較
+
+ネットワーク待ちを模擬したNotionの代替（benchmarks.fake_notion）から
+全ページを取得・解析し、モードごとにステージ別の時間とピークメモリ
+（tracemalloc）を表示する。
+
+    buffered    全ページを取得してから解析（従来のget_words_data()）
+    sequential  1バッチ取得するごとに解析
+    pipelined   次のバッチの取得中に前のバッチをワーカーで解析
+
+    python -m benchmarks.fetch_pipeline --words 10000 --latency-ms 150
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.fake_notion import FakeNotionClient
+from benchmarks.synthetic import make_word_pages
+from src.wordbook.notion_client import fetch_words_snapshot, iter_word_batches
+from src.wordbook.pipeline import StageTimings
+from src.wordbook.records import SnapshotBuilder
+
+WORDS_DB_ID = 'words'
+
+MODES = ('buffered', 'sequential', 'pipelined')
+
+
+def fetch_buffered(notion, timings):
+    """従来の方式: 全ページを溜めてから解析"""
+    all_results = []
+    with timings.measure('total'):
+        with timings.measure('fetch'):
+            for pages in iter_word_batches(notion, WORDS_DB_ID):
+                all_results.extend(pages)
+        builder = SnapshotBuilder()
+        with timings.measure('parse'):
+            builder.add_pages(all_results)
+    return builder.build()
+
+
+def run(notion, mode, trace_memory):
+    """1回取得して (タイミング, ピークメモリ, レコード数) を返す"""
+    timings = StageTimings()
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        if mode == 'buffered':
+            snapshot = fetch_buffered(notion, timings)
+        else:
+            snapshot = fetch_words_snapshot(
+                notion, WORDS_DB_ID, pipelined=mode == 'pipelined',
+                timings=timings)
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return timings, peak, len(snapshot.records)
+
+
+def main(argv=None):
+    """コマンドライン引数を解析して比較を実行"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--words', type=int, default=10000,
+                        help='合成する単語ページ数')
+    parser.add_argument('--latency-ms', type=float, default=150.0,
+                        help='Notion API呼び出しごとの模擬遅延（ms）')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='tracemallocによるメモリ計測を省略（解析が遅くなるため）')
+    args = parser.parse_args(argv)
+
+    notion = FakeNotionClient(
+        {WORDS_DB_ID: make_word_pages(args.words)},
+        latency=args.latency_ms / 1000
+    )
+
+    print(f"{args.words} pages, {args.latency_ms:.0f} ms per query")
+    print(f"{'mode':<12}{'total s':>9}{'fetch s':>9}{'parse s':>9}"
+          f"{'wait s':>9}{'peak MiB':>10}")
+    for mode in MODES:
+        timings, peak, records = run(notion, mode, not args.no_memory)
+        seconds = timings.seconds
+        peak_text = '-' if peak is None else f"{peak / 2 ** 20:.1f}"
+        print(f"{mode:<12}"
+              f"{seconds['total']:>9.2f}{seconds.get('fetch', 0):>9.2f}"
+              f"{seconds.get('parse', 0):>9.2f}{seconds.get('wait', 0):>9.2f}"
+              f"{peak_text:>10}")
+    print(f"{records} unmastered records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Streamlitアプリの同時セッション負荷試験
+
+streamlit.testing.v1.AppTestでstreamlit_app.pyをヘッドレスに実行する。
+AppTestは1プロセスにつき1つのRuntimeしか持てず、同じプロセスで動かすと
+再実行が直列化されるため、セッションごとに別のプロセスを起動して
+同時に操作を始める。Notionは各プロセス内のローカルの代替
+（benchmarks.fake_notion）に差し替える。
+
+各プロセスは共有キャッシュ（Notionの取得結果・単語テーブル）を温めてから
+計測を始める。実際のサーバーでは全セッションが1プロセスのキャッシュを
+共有するため、ここでの計測はキャッシュ済みのデータに対する再実行の
+CPU競合を表す。比較のため、先に1セッションだけで同じ操作を計測し、
+同時実行時の再実行時間との比を競合の指標として表示する。
+また、AppTestはフラグメント単位の再実行に対応していないため、フラグメント
+内の操作も全体の再実行として計測される（実際のブラウザより悲観的な値）。
+
+各セッションは以下の操作を繰り返す:
+    単語選択 → Pick One → ステータス変更 → 確認ダイアログでキャンセル/更新
+
+    python -m benchmarks.load_test --sessions 20 --rounds 5 --words 5000
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+import traceback
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.fake_notion import patch_notion
+from src.wordbook.progress import STATUSES
+from src.wordbook.workbooks import get_workbook
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+
+# 全プロセスの準備（起動・キャッシュの温め）を待つ時間（秒）
+START_TIMEOUT = 300.0
+
+
+class Session:
+    """1ユーザー分のシミュレートされたセッション"""
+
+    def __init__(self, rng, timeout, update_ratio):
+        self.rng = rng
+        self.update_ratio = update_ratio
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.latencies = {}
+
+    def timed(self, step, action):
+        """操作を実行し、再実行にかかった時間を記録"""
+        start = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - start
+        if self.app.exception:
+            raise RuntimeError(f"{step}: {self.app.exception[0].message}")
+        self.latencies.setdefault(step, []).append(elapsed)
+
+    def button(self, text):
+        """ラベルにtextを含むボタンを探す"""
+        for button in self.app.button:
+            if text in str(button.label):
+                return button
+        return None
+
+    def round(self):
+        """一連の操作を1回実行"""
+        app = self.app
+        state = app.session_state
+        # AppTestではダイアログを閉じてもフラグが残るため、ブラウザ同様に閉じる
+        if 'show_dialog' in state:
+            del state['show_dialog']
+
+        word_select = app.selectbox(key='word_selectbox_index')
+        index = self.rng.randrange(len(word_select.options))
+        self.timed('select word',
+                   lambda: word_select.select_index(index).run())
+
+        self.timed('pick one',
+                   lambda: self.button('Pick One').click().run())
+
+        row = app.selectbox(key='word_selectbox_index').value
+        # セッションは最初のワークブックを使う
+        status_select = app.selectbox(
+            key=f'status_update_{get_workbook().id}_{row}')
+        # optionsは表示ラベルのため、ステータスの値から選ぶ
+        new_status = self.rng.choice(
+            [status for status in STATUSES if status != status_select.value])
+        # ダイアログを開く操作はフラグメントの再実行
+        self.timed('status select',
+                   lambda: status_select.set_value(new_status).run())
+
+        if self.rng.random() < self.update_ratio:
+            step, label = 'status update', 'Yes, Update'
+        else:
+            step, label = 'cancel', 'Cancel'
+        button = self.button(label)
+        if button is not None:
+            # ブラウザではダイアログ内のクリックはダイアログ（フラグメント）
+            # だけを再実行する。AppTestでは全体が再実行されるため、ダイアログ
+            # 関数が再び呼ばれるようにフラグを外してからクリックする
+            del state['show_dialog']
+            self.timed(step, lambda: button.click().run())
+
+    def run(self, rounds):
+        """初回表示の後、rounds回の操作を実行"""
+        self.timed('initial load', lambda: self.app.run())
+        for _ in range(rounds):
+            self.round()
+        return self.latencies
+
+
+def run_worker(args, seed, barrier, results):
+    """1プロセスで1セッションを実行し、結果をresultsに入れる"""
+    try:
+        os.environ.setdefault("NOTION_TOKEN", "load-test")
+        fake, patcher = patch_notion(args.words,
+                                     latency=args.latency_ms / 1000,
+                                     seed=args.seed)
+        with patcher:
+            # このプロセスの共有キャッシュを温めておく
+            Session(random.Random(seed), args.timeout, 0).run(0)
+            session = Session(random.Random(seed), args.timeout,
+                              args.update_ratio)
+            if args.trace_memory:
+                tracemalloc.start()
+
+            # 全プロセスの準備が終わってから同時に始める
+            barrier.wait(START_TIMEOUT)
+            started = time.time()
+            latencies = session.run(args.rounds)
+            finished = time.time()
+
+            memory = None
+            if args.trace_memory:
+                memory = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+        # ru_maxrssはLinuxではKiB
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        results.put({
+            'latencies': latencies,
+            'started': started,
+            'finished': finished,
+            'memory': memory,
+            'rss': rss,
+            'updates': fake.update_count,
+        })
+    except BaseException:
+        barrier.abort()
+        results.put({'error': traceback.format_exc()})
+
+
+def run_sessions(args, sessions):
+    """sessions個のプロセスで同時にセッションを実行し、結果のリストを返す"""
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(sessions)
+    results = context.Queue()
+    processes = [
+        context.Process(target=run_worker,
+                        args=(args, args.seed + i, barrier, results),
+                        daemon=True)
+        for i in range(sessions)
+    ]
+    for process in processes:
+        process.start()
+
+    outcomes = []
+    try:
+        for _ in processes:
+            outcome = results.get(
+                timeout=START_TIMEOUT + args.timeout * (args.rounds * 4 + 1))
+            if 'error' in outcome:
+                raise RuntimeError(f"session failed:\n{outcome['error']}")
+            outcomes.append(outcome)
+    except queue.Empty:
+        raise RuntimeError("session timed out") from None
+    finally:
+        for process in processes:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+    return outcomes
+
+
+def collect_steps(outcomes):
+    """操作ごとの再実行時間 {操作: [秒, ...]}（'all'は全操作）"""
+    steps = {}
+    for outcome in outcomes:
+        for step, values in outcome['latencies'].items():
+            steps.setdefault(step, []).extend(values)
+    steps['all'] = [value for values in list(steps.values())
+                    for value in values]
+    return steps
+
+
+def percentile(values, fraction):
+    """値のリストのパーセンタイル"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(outcomes, solo):
+    """集計結果を表示（soloは1セッションだけで実行した結果）"""
+    steps = collect_steps(outcomes)
+    solo_steps = collect_steps(solo) if solo else {}
+    all_values = steps['all']
+    elapsed = (max(outcome['finished'] for outcome in outcomes)
+               - min(outcome['started'] for outcome in outcomes))
+
+    print(f"sessions: {len(outcomes)} (1 process each, "
+          f"{os.cpu_count()} CPUs)  reruns: {len(all_values)}  "
+          f"elapsed: {elapsed:.2f}s  "
+          f"throughput: {len(all_values) / elapsed:.1f} reruns/s")
+    header = (f"{'step':<15} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'max ms':>8}")
+    if solo_steps:
+        header += f" {'solo p95':>9} {'slowdown':>9}"
+    print(header)
+    for step, values in steps.items():
+        p95 = percentile(values, 0.95)
+        line = (f"{step:<15} {len(values):>6} "
+                f"{statistics.median(values) * 1000:>8.1f} "
+                f"{p95 * 1000:>8.1f} {max(values) * 1000:>8.1f}")
+        if step in solo_steps:
+            solo_p95 = percentile(solo_steps[step], 0.95)
+            line += f" {solo_p95 * 1000:>9.1f} {p95 / solo_p95:>8.2f}x"
+        print(line)
+
+    rss = [outcome['rss'] for outcome in outcomes]
+    print(f"peak RSS per session process: {statistics.median(rss) / 2 ** 20:.0f}"
+          f" MiB (max {max(rss) / 2 ** 20:.0f} MiB, including the interpreter"
+          f" and caches)")
+    memory = [outcome['memory'] for outcome in outcomes
+              if outcome['memory'] is not None]
+    if memory:
+        print(f"memory per session: {statistics.median(memory) / 1024:.0f} KiB "
+              f"(tracemalloc, excluding shared caches)")
+    print(f"status updates sent to the stand-in: "
+          f"{sum(outcome['updates'] for outcome in outcomes)}")
+
+
+def main(argv=None):
+    """コマンドライン引数を解析して負荷試験を実行"""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sessions', type=int, default=10,
+                        help='同時セッション数（セッションごとに1プロセス）')
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='セッションごとの操作の繰り返し回数')
+    parser.add_argument('--words', type=int, default=2000,
+                        help='合成する単語数')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='Notion API呼び出しごとの模擬遅延（ms）')
+    parser.add_argument('--update-ratio', type=float, default=0.2,
+                        help='確認ダイアログで更新を選ぶ割合')
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help='1回の再実行のタイムアウト（秒）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='tracemallocでセッションあたりのメモリを計測')
+    parser.add_argument('--no-solo', action='store_true',
+                        help='1セッションだけでの比較用の計測を省略')
+    args = parser.parse_args(argv)
+
+    solo = None if args.no_solo else run_sessions(args, 1)
+    outcomes = run_sessions(args, args.sessions)
+    report(outcomes, solo)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+単語レコード1件あたりのメモリ使用量を計測
+
+従来のdict行とWordRecordを、JSONデコード直後のページから同じ条件で作成し、
+生ページを破棄した後に残るメモリをtracemallocで比較する。
+
+    python -m benchmarks.record_memory 1000 10000 100000
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+
+from benchmarks.synthetic import make_word_pages
+from src.wordbook.records import parse_word_page
+
+
+def legacy_row(page):
+    """従来のget_words_data()と同じdict行を作成"""
+    record = parse_word_page(page)
+    row = record.to_dict()
+    # 従来はJSONデコードされた文字列をそのまま保持していた
+    row['Status'] = page['properties']['Status']['status']['name']
+    row['page_id'] = page['id']
+    return row
+
+
+def measure(builder, blob):
+    """生ページから行を作成し、ページ破棄後に残るバイト数を返す"""
+    gc.collect()
+    tracemalloc.start()
+    pages = json.loads(blob)
+    rows = [builder(page) for page in pages]
+    del pages
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert rows
+    return current
+
+
+def main(sizes):
+    """サイズごとの1件あたりバイト数を表示"""
+    print(f"{'records':>8} {'dict B/rec':>11} {'WordRecord B/rec':>17} "
+          f"{'saving':>7}")
+    for size in sizes:
+        blob = json.dumps(make_word_pages(size))
+        legacy = measure(legacy_row, blob) / size
+        compact = measure(parse_word_page, blob) / size
+        saving = 1 - compact / legacy
+        print(f"{size:>8} {legacy:>11.0f} {compact:>17.0f} {saving:>7.0%}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク・負荷試験用の合成Notionデータ
+"""
+
+import random
+import uuid
+
+STATUSES = ['Not Sure', 'Seen It', 'Almost There', 'Mastered']
+
+
+def make_rich_text(text, chunks=1):
+    """plain_textをchunks個に分割したrich_text配列を作成"""
+    size = max(1, len(text) // chunks)
+    pieces = [text[i:i + size] for i in range(0, len(text), size)] or ['']
+    return [{'type': 'text', 'plain_text': piece} for piece in pieces]
+
+
+def make_word_page(index, rng=None):
+    """Wordsデータベースのページ1件分を合成"""
+    rng = rng or random
+    section = index // 20 + 1
+    example_no = index % 20 + 1
+    word = f"word{index:06d}"
+    sentence = f"This is an example sentence for {word}.\nSecond line {index}."
+    return {
+        'object': 'page',
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'last_edited_time': '2026-01-01T00:00:00.000Z',
+        'properties': {
+            'Word': {'type': 'title', 'title': make_rich_text(word)},
+            'Example No': {
+                'type': 'rollup',
+                'rollup': {'type': 'array', 'array': [
+                    {'type': 'title',
+                     'title': make_rich_text(str(example_no))}
+                ]}
+            },
+            'Section': {
+                'type': 'rollup',
+                'rollup': {'type': 'array', 'array': [
+                    {'type': 'number', 'number': section}
+                ]}
+            },
+            'Example sentence': {
+                'type': 'rollup',
+                'rollup': {'type': 'array', 'array': [
+                    {'type': 'rich_text',
+                     'rich_text': make_rich_text(sentence, chunks=3)}
+                ]}
+            },
+            'Example': {'type': 'relation', 'relation': []},
+            'Status': {
+                'type': 'status',
+                'status': {'name': rng.choice(STATUSES)}
+            },
+        }
+    }
+
+
+def make_word_pages(count, seed=0):
+    """ページをcount件合成（seedで再現可能）"""
+    rng = random.Random(seed)
+    return [make_word_page(i, rng) for i in range(count)]
@@ -3,73 +3,202 @@
 データベース詳細確認
 """
 
+import json
 import os
+from pathlib import Path
+
 from dotenv import load_dotenv
-from notion_client import Client
+from notion_client.helpers import collect_paginated_api
+
+from src.wordbook.async_notion import NotionFacade, gather_all
+from src.wordbook.workbooks import load_workbooks
 
 load_dotenv()
 
+# スキーマのキャッシュファイル（last_edited_timeが同じデータベースは再取得しない）
+SCHEMA_CACHE_PATH = Path(
+    os.getenv("WORDBOOK_SCHEMA_CACHE", ".wordbook/schema_cache.json"))
+
+
+def load_schema_cache():
+    """キャッシュファイルを読み込む"""
+    try:
+        with open(SCHEMA_CACHE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_schema_cache(cache):
+    """キャッシュファイルに書き込む"""
+    SCHEMA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = SCHEMA_CACHE_PATH.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, SCHEMA_CACHE_PATH)
+
+
+def get_last_edited_times(notion):
+    """検索結果を最後までたどり、データベースごとのlast_edited_timeを取得"""
+    databases = collect_paginated_api(
+        notion.search,
+        filter={"property": "object", "value": "database"}
+    )
+    return {db['id']: db.get('last_edited_time') for db in databases}
+
+
+async def inspect_database(notion, db_id):
+    """データベースのスキーマとサンプルデータを取得"""
+    # データベース詳細とデータベース内のページ（最初の5件）を並行して取得
+    database, query_result = await gather_all(
+        notion.request('databases.retrieve', database_id=db_id),
+        notion.request('databases.query', database_id=db_id, page_size=5)
+    )
+
+    # タイトル
+    title = "無題"
+    if database.get('title') and len(database['title']) > 0:
+        title = database['title'][0]['plain_text']
+
+    # プロパティ
+    properties = {
+        prop_name: prop_info.get('type', 'unknown')
+        for prop_name, prop_info in database['properties'].items()
+    }
+
+    # サンプルデータ（タイトルプロパティと、最初のリレーション先のページID）
+    samples = []
+    related_ids = []
+    for page in query_result['results'][:3]:
+        sample = None
+        related_id = None
+        for prop_value in page['properties'].values():
+            prop_type = prop_value.get('type')
+            if prop_type == 'title' and sample is None:
+                if prop_value.get('title') and len(prop_value['title']) > 0:
+                    sample = prop_value['title'][0]['plain_text']
+            elif prop_type == 'relation' and related_id is None:
+                relations = prop_value.get('relation') or []
+                if relations:
+                    related_id = relations[0]['id']
+        samples.append(sample)
+        related_ids.append(related_id)
+
+    return {
+        'last_edited_time': database.get('last_edited_time'),
+        'title': title,
+        'properties': properties,
+        'page_count': len(query_result['results']),
+        'samples': samples,
+        'related_ids': related_ids,
+    }
+
+
+def print_database(i, db_id, info, cached, sentence_texts):
+    """データベースの情報を表示（sentence_textsはリレーション先の例文）"""
+    print(f"=== データベース {i} ===")
+    print(f"ID: {db_id}")
+
+    if 'error' in info:
+        print(f"エラー: {info['error']}")
+        print()
+        return
+
+    print(f"タイトル: {info['title']}" + ("（キャッシュ）" if cached else ""))
+
+    # URL
+    url = f"https://www.notion.so/{db_id.replace('-', '')}"
+    print(f"URL: {url}")
+
+    print("プロパティ:")
+    for prop_name, prop_type in info['properties'].items():
+        print(f"  - {prop_name}: {prop_type}")
+
+    print(f"ページ数（最初の5件）: {info['page_count']}")
+
+    if info['samples']:
+        print("サンプルデータ:")
+        related_ids = info.get('related_ids') or [None] * len(info['samples'])
+        for j, (sample, related_id) in enumerate(
+                zip(info['samples'], related_ids), 1):
+            print(f"  {j}. {sample if sample else 'タイトルなし'}")
+            if sentence_texts.get(related_id):
+                print(f"     例文: {sentence_texts[related_id]}")
+
+    print()
+
 
 def check_databases():
     """データベースの詳細を確認"""
     notion_token = os.getenv("NOTION_TOKEN")
-    notion = Client(auth=notion_token)
-
-    # 発見されたデータベースID
-    database_ids = [
-        "2230dc53-a13b-8007-91d2-c3ed98f8dc95",
-        "2230dc53-a13b-8055-9c36-cbe6162846ef"
-    ]
+    notion = NotionFacade(auth=notion_token)
+    try:
+        report_databases(notion)
+    finally:
+        notion.close()
+
+
+def report_databases(notion):
+    """設定された全データベースの詳細を表示"""
+    # 設定された全ワークブックのデータベースID（重複を除く）
+    database_ids = []
+    for workbook in load_workbooks().values():
+        for db_id in (workbook.words_db_id, workbook.sentences_db_id):
+            if db_id and db_id not in database_ids:
+                database_ids.append(db_id)
+
+    cache = load_schema_cache()
+    try:
+        last_edited_times = get_last_edited_times(notion)
+    except Exception as e:
+        print(f"検索エラー: {e}")
+        last_edited_times = {}
+
+    # 前回から変更のないデータベースはキャッシュを使う
+    cached_ids = {
+        db_id for db_id in database_ids
+        if db_id in cache and last_edited_times.get(db_id) is not None
+        and cache[db_id]['last_edited_time'] == last_edited_times[db_id]
+    }
+    stale_ids = [db_id for db_id in database_ids if db_id not in cached_ids]
+
+    async def fetch(db_id):
+        try:
+            return await inspect_database(notion, db_id)
+        except Exception as e:
+            return {'error': str(e)}
 
-    for i, db_id in enumerate(database_ids, 1):
-        print(f"=== データベース {i} ===")
-        print(f"ID: {db_id}")
+    # 変更のあったデータベースを並行して取得（同時リクエスト数はファサードで制限）
+    fetched = dict(zip(stale_ids,
+                       notion.gather(*(fetch(db_id) for db_id in stale_ids))))
 
+    for db_id, info in fetched.items():
+        if 'error' not in info:
+            cache[db_id] = info
+    if fetched:
         try:
-            # データベース詳細を取得
-            database = notion.databases.retrieve(database_id=db_id)
-
-            # タイトル
-            title = "無題"
-            if database.get('title') and len(database['title']) > 0:
-                title = database['title'][0]['plain_text']
-            print(f"タイトル: {title}")
-
-            # URL
-            url = f"https://www.notion.so/{db_id.replace('-', '')}"
-            print(f"URL: {url}")
-
-            # プロパティ
-            print("プロパティ:")
-            for prop_name, prop_info in database['properties'].items():
-                prop_type = prop_info.get('type', 'unknown')
-                print(f"  - {prop_name}: {prop_type}")
-
-            # データベース内のページ数を取得
-            query_result = notion.databases.query(
-                database_id=db_id, page_size=5)
-            page_count = len(query_result['results'])
-            print(f"ページ数（最初の5件）: {page_count}")
-
-            # サンプルデータを表示
-            if query_result['results']:
-                print("サンプルデータ:")
-                for j, page in enumerate(query_result['results'][:3], 1):
-                    print(f"  {j}. ", end="")
-                    # タイトルプロパティを探す
-                    for prop_name, prop_value in page['properties'].items():
-                        if prop_value.get('type') == 'title':
-                            if prop_value.get('title') and len(prop_value['title']) > 0:
-                                title_text = prop_value['title'][0]['plain_text']
-                                print(f"{title_text}")
-                                break
-                    else:
-                        print("タイトルなし")
-
+            save_schema_cache(cache)
+        except OSError as e:
+            print(f"キャッシュ保存エラー: {e}")
+
+    infos = {db_id: fetched.get(db_id) or cache[db_id]
+             for db_id in database_ids}
+
+    # サンプルのリレーション先（Wordsでは例文）をまとめて並行に取得し、
+    # Sentencesデータベースを参照できるかを確認する
+    related_ids = list(dict.fromkeys(
+        related_id for info in infos.values()
+        for related_id in info.get('related_ids', ()) if related_id))
+    sentence_texts = {}
+    if related_ids:
+        try:
+            sentence_texts = notion.sentence_texts(related_ids)
         except Exception as e:
-            print(f"エラー: {e}")
+            print(f"例文取得エラー: {e}")
 
-        print()
+    for i, db_id in enumerate(database_ids, 1):
+        print_database(i, db_id, infos[db_id], db_id in cached_ids,
+                       sentence_texts)
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ Wordbook - Notion連携単語帳アプリケーション
 import os
 from dotenv import load_dotenv
 from notion_client import Client
+from notion_client.helpers import collect_paginated_api
 
 # 環境変数を読み込み
 load_dotenv()
@@ -32,14 +33,15 @@ def main():
         users = notion.users.list()
         print(f"ユーザー数: {len(users['results'])}")
 
-        # データベース一覧を取得
+        # データベース一覧を取得（検索結果を最後までたどる）
         print("\n=== データベース一覧 ===")
-        search_results = notion.search(
+        databases = collect_paginated_api(
+            notion.search,
             filter={"property": "object", "value": "database"}
         )
 
-        if search_results['results']:
-            for i, db in enumerate(search_results['results'], 1):
+        if databases:
+            for i, db in enumerate(databases, 1):
                 db_title = "無題"
                 if db.get('title') and len(db['title']) > 0:
                     db_title = db['title'][0]['plain_text']
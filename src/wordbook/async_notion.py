@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+非同期Notionデータ層と同期ファサード
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+from notion_client import AsyncClient
+
+from .records import parse_sentence_page
+
+# Notion APIへの同時リクエスト数の上限（平均3リクエスト/秒の制限に合わせる）
+MAX_CONCURRENCY = 3
+
+
+async def call_bounded(limiter, func, breaker=None, **kwargs):
+    """同時実行数の上限内で、breakerがあればブレーカー越しにNotion APIを呼び出す"""
+    async with limiter:
+        if breaker is None:
+            return await func(**kwargs)
+        return await breaker.call_async(func, **kwargs)
+
+
+async def gather_all(*aws):
+    """すべてを並行に実行し、1つでも失敗・キャンセルされたら残りをキャンセル"""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def fetch_sentence_text(notion, sentence_id, limiter, breaker=None):
+    """例文IDから例文テキストを取得"""
+    if not sentence_id:
+        return ""
+    page = await call_bounded(limiter, notion.pages.retrieve, breaker,
+                              page_id=sentence_id)
+    return parse_sentence_page(page)
+
+
+async def fetch_sentence_texts(notion, sentence_ids, limiter, breaker=None):
+    """複数の例文を並行して取得（{例文ID: テキスト}）"""
+    texts = await gather_all(*(
+        fetch_sentence_text(notion, sentence_id, limiter, breaker)
+        for sentence_id in sentence_ids
+    ))
+    return dict(zip(sentence_ids, texts))
+
+
+async def update_status(notion, page_id, new_status, limiter, breaker=None):
+    """単語のステータスを更新"""
+    return await call_bounded(
+        limiter,
+        notion.pages.update,
+        breaker,
+        page_id=page_id,
+        properties={
+            "Status": {
+                "status": {
+                    "name": new_status
+                }
+            }
+        }
+    )
+
+
+class SyncEndpoint:
+    """ファサード越しにエンドポイントを同期的に呼び出すためのプロキシ
+
+    facade.databases.query(...)のように、notion_client.Clientと同じ形で
+    呼び出せる。
+    """
+
+    def __init__(self, facade, name):
+        self.facade = facade
+        self.name = name
+
+    def __getattr__(self, method):
+        return functools.partial(self.facade.call, f"{self.name}.{method}")
+
+
+class NotionFacade:
+    """非同期データ層を同期的に呼び出すためのファサード
+
+    専用スレッドで1つのイベントループを動かし、Streamlitの再実行やCLI
+    スクリプトからの呼び出しをすべてそのループで処理する。同時リクエスト数は
+    ファサード全体で制限され、timeoutを超えた呼び出しはキャンセルされる。
+    breaker（resilience.CircuitBreaker）があれば全呼び出しがそれを通る。
+    databases・pages・search()はnotion_client.Clientと同じ形で呼び出せる。
+    """
+
+    def __init__(self, auth=None, max_concurrency=MAX_CONCURRENCY,
+                 timeout_ms=None, client=None, breaker=None):
+        self.breaker = breaker
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name='notion-async', daemon=True)
+        self.thread.start()
+
+        async def setup():
+            # Semaphoreとクライアントはループ内で作成する
+            options = {'timeout_ms': timeout_ms} if timeout_ms else {}
+            notion = client or AsyncClient(auth=auth, **options)
+            return notion, asyncio.Semaphore(max_concurrency)
+
+        self.notion, self.limiter = self.run(setup())
+        self.databases = SyncEndpoint(self, 'databases')
+        self.pages = SyncEndpoint(self, 'pages')
+
+    def run(self, coro, timeout=None):
+        """コルーチンをループで実行して結果を待つ（タイムアウトでキャンセル）"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Notion request timed out after {timeout}s")
+
+    def gather(self, *coros, timeout=None):
+        """複数のコルーチンを同じループで並行に実行"""
+        return self.run(gather_all(*coros), timeout)
+
+    def request(self, path, **kwargs):
+        """Notion APIを呼び出すコルーチン（pathは'databases.query'など）
+
+        同時実行数の上限とブレーカーを通して呼び出す。gather()に渡すと
+        複数の呼び出しを並行に実行できる。
+        """
+        func = self.notion
+        for name in path.split('.'):
+            func = getattr(func, name)
+        return call_bounded(self.limiter, func, self.breaker, **kwargs)
+
+    def call(self, path, timeout=None, **kwargs):
+        """Notion APIを呼び出して結果を待つ"""
+        return self.run(self.request(path, **kwargs), timeout)
+
+    def search(self, **kwargs):
+        """検索（notion_client.Client.searchと同じ引数）"""
+        return self.call('search', **kwargs)
+
+    def sentence_texts(self, sentence_ids, timeout=None):
+        """複数の例文を並行して取得"""
+        return self.run(
+            fetch_sentence_texts(self.notion, sentence_ids, self.limiter,
+                                 self.breaker),
+            timeout)
+
+    def update_status(self, page_id, new_status, timeout=None):
+        """単語のステータスを更新"""
+        return self.run(
+            update_status(self.notion, page_id, new_status, self.limiter,
+                          self.breaker),
+            timeout)
+
+    def close(self):
+        """クライアントを閉じてループを停止"""
+        if hasattr(self.notion, 'aclose'):
+            self.run(self.notion.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
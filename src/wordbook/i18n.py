@@ -1,98 +1,191 @@
 #!/usr/bin/env python3
 """
 国際化対応（i18n）モジュール
+
+翻訳はlocales/<言語>.jsonに {グループ: {キー: テキスト}} の形で置く。
+カタログは言語ごとに初めて使われたときに読み込み、既定の言語で欠けている
+キーを補った1つの辞書にまとめる。キーの不足・余分は次のコマンドで確認する:
+
+    python -m src.wordbook.i18n
 """
 
+import functools
+import json
+import re
+import sys
+from pathlib import Path
+
 # 言語設定
 LANGUAGES = {
     'en': 'English',
     'ja': '日本語'
 }
 
-# テキスト定義
-TEXTS = {
-    'en': {
-        # Page config
-        'page_title': 'Wordbook - Unmastered Words by Section',
-
-        # Main UI
-        'app_title': '📚 Wordbook',
-        'unmastered_words_header': '📖 Unmastered words.',
-        'words_found': 'words found',
-        'select_word': 'Select a word:',
-        'select_word_help': 'Select a word to display example sentences',
-        'pick_one_button': '🎲 Pick One',
-        'pick_one_help': 'Randomly select a word',
-        'example_sentences_for': 'Example sentences for:',
-        'section': 'Section',
-        'number': 'No.',
-        'status': 'Status',
-
-        # Messages
-        'loading_words': 'Loading unmastered words...',
-        'no_data_found': 'No data found',
-        'no_unmastered_words': 'No unmastered words found.',
-        'no_example_sentences': 'No example sentences for this word.',
-        'sentence_fetch_error': 'Failed to fetch example sentences:',
-        'notion_api_error': 'Notion API connection error:',
-        'notion_token_missing': 'NOTION_TOKEN is not set',
-
-        # Settings
-        'language_setting': 'Language',
-        'language_help': 'Select your preferred language',
-
-        # Status update
-        'update_status': 'Update Status',
-        'update_status_help': 'Update the learning status of this word',
-        'status_updated': 'Status updated successfully!',
-        'status_update_error': 'Failed to update status:',
-        'updating_status': 'Updating status...'
-    },
-    'ja': {
-        # Page config
-        'page_title': 'Wordbook - セクション別未習得単語',
-
-        # Main UI
-        'app_title': '📚 Wordbook',
-        'unmastered_words_header': '📖 未習得単語',
-        'words_found': '語が見つかりました',
-        'select_word': '単語を選択:',
-        'select_word_help': '単語を選択すると例文が表示されます',
-        'pick_one_button': '🎲 Pick One',
-        'pick_one_help': 'ランダムに単語を選択',
-        'example_sentences_for': '例文:',
-        'section': 'セクション',
-        'number': '番号',
-        'status': 'ステータス',
-
-        # Messages
-        'loading_words': '未習得単語を読み込み中...',
-        'no_data_found': 'データが見つかりませんでした',
-        'no_unmastered_words': '未習得単語が見つかりませんでした。',
-        'no_example_sentences': 'この単語には例文がありません。',
-        'sentence_fetch_error': '例文の取得に失敗しました:',
-        'notion_api_error': 'Notion API接続エラー:',
-        'notion_token_missing': 'NOTION_TOKENが設定されていません',
-
-        # Settings
-        'language_setting': '言語',
-        'language_help': '使用する言語を選択してください',
-
-        # Status update
-        'update_status': 'ステータス更新',
-        'update_status_help': 'この単語の学習ステータスを更新します',
-        'status_updated': 'ステータスが正常に更新されました！',
-        'status_update_error': 'ステータス更新に失敗しました:',
-        'updating_status': 'ステータス更新中...'
-    }
+# キーが欠けている場合に使う言語
+DEFAULT_LANGUAGE = 'en'
+
+# カタログファイルの置き場所
+LOCALES_DIR = Path(__file__).resolve().parent / "locales"
+
+# 使われているキーを調べるソースファイル
+SOURCE_PATHS = (
+    Path(__file__).resolve().parents[2] / "streamlit_app.py",
+    *sorted(Path(__file__).resolve().parent.glob('*.py')),
+)
+
+# ソース中のキー参照（texts[...]・get_text(...)の先頭の文字列リテラル）
+KEY_REFERENCE = re.compile(r"""(?:texts\[|get_text\()['"](\w+)['"]""")
+
+# 学習ステータス（Notionの値）に対応するカタログのキーとemoji
+STATUS_TEXT_KEYS = {
+    'Not Sure': 'status_not_sure',
+    'Seen It': 'status_seen_it',
+    'Almost There': 'status_almost_there',
+    'Mastered': 'status_mastered',
+}
+STATUS_EMOJIS = {
+    'Not Sure': '🤔',
+    'Seen It': '👀',
+    'Almost There': '😃',
+    'Mastered': '✅',  # 通常は表示されないが念のため
 }
+UNKNOWN_STATUS_EMOJI = '❓'
+
+# 読み込み済みの検索用テーブル {言語: {キー: テキスト}}
+CATALOGS = {}
+
+
+def read_catalog(lang):
+    """カタログファイルを読み込み、グループをまとめた {キー: テキスト} を返す"""
+    with open(LOCALES_DIR / f"{lang}.json", encoding='utf-8') as f:
+        groups = json.load(f)
+    texts = {}
+    for group in groups.values():
+        texts.update(group)
+    return texts
+
+
+def load_catalog(lang):
+    """言語の検索用テーブル（言語ごとに1度だけ作成、変更しないこと）"""
+    if lang not in LANGUAGES:
+        lang = DEFAULT_LANGUAGE
+    catalog = CATALOGS.get(lang)
+    if catalog is None:
+        catalog = {}
+        if lang != DEFAULT_LANGUAGE:
+            catalog.update(load_catalog(DEFAULT_LANGUAGE))
+        catalog.update(read_catalog(lang))
+        CATALOGS[lang] = catalog
+    return catalog
 
 
 def get_text(key, lang='en'):
     """指定されたキーと言語のテキストを取得"""
-    return TEXTS.get(lang, TEXTS['en']).get(key, key)
+    catalog = CATALOGS.get(lang) or load_catalog(lang)
+    return catalog.get(key, key)
 
 
 def get_available_languages():
     """利用可能な言語のリストを取得"""
     return LANGUAGES
+
+
+class TextBundle:
+    """1言語分の、再実行のたびに表示する文字列
+
+    bundle[key]でテキストを参照する。ステータスの表示名とラベル
+    （emoji付き）は作成時に1度だけ組み立てる。
+    """
+
+    def __init__(self, lang):
+        self.lang = lang
+        self.texts = load_catalog(lang)
+        self.status_names = {
+            status: self.texts.get(key, status)
+            for status, key in STATUS_TEXT_KEYS.items()
+        }
+        self.status_labels = {
+            status: f"{STATUS_EMOJIS[status]} {name}"
+            for status, name in self.status_names.items()
+        }
+        self.unknown_status = (f"{UNKNOWN_STATUS_EMOJI} "
+                               f"{self.texts.get('status_unknown', '?')}")
+
+    def __getitem__(self, key):
+        return self.texts.get(key, key)
+
+    def status_label(self, status):
+        """ステータスのemoji付き表示名"""
+        return self.status_labels.get(status, self.unknown_status)
+
+
+@functools.lru_cache(maxsize=None)
+def get_bundle(lang):
+    """言語ごとのTextBundle（言語ごとに1度だけ作成）"""
+    return TextBundle(lang if lang in LANGUAGES else DEFAULT_LANGUAGE)
+
+
+def find_key_references():
+    """ソースファイル中で参照しているキー [(パス, キー), ...]"""
+    references = []
+    for path in SOURCE_PATHS:
+        if not path.exists():
+            continue
+        source = path.read_text(encoding='utf-8')
+        for key in sorted(set(KEY_REFERENCE.findall(source))):
+            references.append((path, key))
+    return references
+
+
+def check_catalogs():
+    """全言語のカタログを検証し、問題点のリストを返す
+
+    既定の言語のキーを基準に、不足・余分なキー、グループ間での重複、
+    ステータス用のキーやソースで参照しているキーの不足を調べる。
+    """
+    problems = []
+    catalogs = {}
+    for lang in LANGUAGES:
+        try:
+            with open(LOCALES_DIR / f"{lang}.json", encoding='utf-8') as f:
+                groups = json.load(f)
+        except (OSError, ValueError) as e:
+            problems.append(f"{lang}: cannot read catalog: {e}")
+            continue
+        seen = {}
+        for group_name, group in groups.items():
+            for key in group:
+                if key in seen:
+                    problems.append(f"{lang}: '{key}' is defined in both "
+                                    f"'{seen[key]}' and '{group_name}'")
+                seen[key] = group_name
+        catalogs[lang] = seen
+
+    for path in sorted(LOCALES_DIR.glob('*.json')):
+        if path.stem not in LANGUAGES:
+            problems.append(f"{path.stem}: catalog is not listed in LANGUAGES")
+
+    reference = catalogs.get(DEFAULT_LANGUAGE, {})
+    required = set(STATUS_TEXT_KEYS.values()) | {'status_unknown'}
+    for key in sorted(required - set(reference)):
+        problems.append(f"{DEFAULT_LANGUAGE}: missing status key '{key}'")
+    for path, key in find_key_references():
+        if key not in reference:
+            problems.append(f"{DEFAULT_LANGUAGE}: missing key '{key}' "
+                            f"used in {path.name}")
+    for lang, keys in catalogs.items():
+        if lang == DEFAULT_LANGUAGE:
+            continue
+        for key in sorted(set(reference) - set(keys)):
+            problems.append(f"{lang}: missing key '{key}'")
+        for key in sorted(set(keys) - set(reference)):
+            problems.append(f"{lang}: unknown key '{key}'")
+    return problems
+
+
+if __name__ == "__main__":
+    found = check_catalogs()
+    for problem in found:
+        print(problem)
+    print(f"{len(found)} problem(s) in {len(LANGUAGES)} catalog(s)")
+    sys.exit(1 if found else 0)
@@ -3,23 +3,107 @@
 Notion API クライアントとデータ取得機能
 """
 
+import concurrent.futures
+import logging
 import os
+import time
+from typing import NamedTuple
+
 import streamlit as st
 from dotenv import load_dotenv
-from notion_client import Client
+
+from .async_notion import NotionFacade
+from .pipeline import QueryCursor, StageTimings, run_pipeline
+from .records import SnapshotBuilder, diff_snapshots, parse_sentence_page
+from .resilience import CircuitBreaker
+from .workbooks import WorkbookRegistry, load_workbooks
 
 # 環境変数を読み込み
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Notion API 1回あたりのタイムアウト（ミリ秒）
+NOTION_TIMEOUT_MS = 10000
+
+# 1回の再実行で単語データの取得を待つ時間（秒）
+# 取得自体はバックグラウンドで続き、間に合わなければ前回のデータを表示する
+RERUN_LATENCY_BUDGET = 20.0
+
+# 取得した単語データを最新とみなす時間（秒）
+WORDS_TTL = 60.0
+
+# サーキットブレーカーが開くまでの連続失敗回数と、開いている時間（秒）
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 30.0
+
+# 取得と解析を重ねて実行するか（WORDBOOK_PIPELINED_FETCH=0で無効）
+PIPELINED_FETCH = os.getenv("WORDBOOK_PIPELINED_FETCH", "1") != "0"
+
+# 日次の進捗を保存するファイル（{workbook}はワークブックID、なければ
+# ファイル名の末尾に付ける）
+PROGRESS_HISTORY_PATH = os.getenv(
+    "WORDBOOK_PROGRESS_FILE", ".wordbook/progress-{workbook}.csv")
+
+# 状態を保持するワークブック数の目安と、使われなくなってから
+# 破棄するまでの秒数（目安を超えている間はWORKBOOK_MIN_IDLE秒で破棄する）
+MAX_ACTIVE_WORKBOOKS = 4
+WORKBOOK_IDLE_TIMEOUT = 1800.0
+WORKBOOK_MIN_IDLE = 300.0
+
 
 @st.cache_resource
 def get_notion_client():
-    """Notionクライアントを取得（リソースキャッシュあり）"""
+    """Notionクライアントを取得（リソースキャッシュあり）
+
+    非同期データ層の同期ファサードを返す。全セッションの取得・更新が
+    1つのイベントループ、同時リクエスト数の上限、サーキットブレーカーを
+    共有する。
+    """
     notion_token = os.getenv("NOTION_TOKEN")
     if not notion_token:
         st.error("NOTION_TOKENが設定されていません")
         st.stop()
-    return Client(auth=notion_token)
+    return NotionFacade(auth=notion_token, timeout_ms=NOTION_TIMEOUT_MS,
+                        breaker=get_circuit_breaker())
+
+
+@st.cache_resource
+def get_circuit_breaker():
+    """Notion呼び出し用のサーキットブレーカー（全セッションで共有）"""
+    return CircuitBreaker(
+        failure_threshold=BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=BREAKER_RESET_TIMEOUT
+    )
+
+
+@st.cache_resource
+def get_workbooks():
+    """設定されたワークブック {ID: Workbook}"""
+    return load_workbooks()
+
+
+@st.cache_resource
+def get_workbook_registry():
+    """ワークブックごとの同期状態（全セッションで共有）"""
+    return WorkbookRegistry(
+        PROGRESS_HISTORY_PATH,
+        max_active=MAX_ACTIVE_WORKBOOKS,
+        idle_timeout=WORKBOOK_IDLE_TIMEOUT,
+        min_idle=WORKBOOK_MIN_IDLE
+    )
+
+
+def get_workbook_state(workbook):
+    """ワークブックの同期状態（スナップショット・進捗・履歴）を取得"""
+    return get_workbook_registry().get(workbook)
+
+
+@st.cache_resource
+def get_fetch_executor():
+    """単語データを取得するバックグラウンドのスレッド（全セッションで共有）"""
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=MAX_ACTIVE_WORKBOOKS, thread_name_prefix='wordbook-fetch')
 
 
 @st.cache_data(ttl=60, show_spinner=False)  # スピナーを非表示
@@ -32,181 +116,189 @@ def get_sentence_text(sentence_id):
 
     try:
         sentence_page = notion.pages.retrieve(page_id=sentence_id)
-        properties = sentence_page['properties']
 
         # Example sentence (rich_text) プロパティから例文を取得
-        example_sentence_prop = properties.get('Example sentence')
-        is_rich_text = (
-            example_sentence_prop and
-            example_sentence_prop.get('type') == 'rich_text'
-        )
-        if is_rich_text:
-            rich_text_data = example_sentence_prop.get('rich_text', [])
-            if rich_text_data:
-                sentence_parts = []
-                for text_element in rich_text_data:
-                    if text_element.get('plain_text'):
-                        sentence_parts.append(text_element['plain_text'])
-                text = ''.join(sentence_parts).strip()
-                return text
+        return parse_sentence_page(sentence_page)
     except Exception:
         pass
 
     return ""
 
 
-@st.cache_data(ttl=60, show_spinner=False)  # スピナーを非表示
-def get_words_data():
-    """Wordsデータベースから全データを取得"""
-    notion = get_notion_client()  # キャッシュされたクライアントを使用
-    words_db_id = "2230dc53-a13b-8007-91d2-c3ed98f8dc95"  # WordsデータベースのID
-
+def iter_word_batches(notion, words_db_id):
+    """Wordsデータベースを1回の問い合わせ分ずつ取得するイテレータ"""
+    cursor = QueryCursor(words_db_id)
+
+    while not cursor.done:
+        result = notion.databases.query(**cursor.params())
+        cursor.advance(result)
+        # 生のページは解析側だけが参照し、解析が終われば解放される
+        yield result.pop('results')
+
+
+def fetch_words_snapshot(notion, words_db_id, pipelined=PIPELINED_FETCH,
+                         timings=None):
+    """Wordsデータベースを取得しながら解析してWordSnapshotを作成
+
+    pipelinedなら、次の問い合わせの応答を待つ間に前のバッチを
+    ワーカースレッドで解析する。ステージ別の時間をログに出す。
+    """
+    timings = timings or StageTimings()
+    builder = SnapshotBuilder()
+
+    with timings.measure('total'):
+        run_pipeline(iter_word_batches(notion, words_db_id),
+                     builder.add_pages, timings, pipelined)
+
+    snapshot = builder.build()._replace(timings=dict(timings.seconds))
+    logger.info("words %s fetched (%s, %d records): %s", words_db_id,
+                'pipelined' if pipelined else 'sequential',
+                len(snapshot.records), timings.summary())
+    return snapshot
+
+
+class WordsLoad(NamedTuple):
+    """load_words_snapshot()の結果"""
+    snapshot: object  # 表示するWordSnapshot（なければNone）
+    read_only: bool  # 最新のデータではないため更新を受け付けない
+    loading: bool  # バックグラウンドで取得中
+
+
+def is_fresh(state):
+    """最後のスナップショットを最新とみなせるか（更新後・WORDS_TTL経過後は古い）"""
+    snapshot = state.snapshot
+    return (snapshot is not None
+            and state.snapshot_generation == state.generation
+            and time.time() - snapshot.fetched_at < WORDS_TTL)
+
+
+def invalidate_words(state):
+    """スナップショットを古いものとし、取得中の結果も使わないようにする"""
+    with state.lock:
+        state.generation += 1
+
+
+def fetch_workbook_words(state, generation):
+    """（バックグラウンド）単語データを取得してワークブックの状態に反映
+
+    取得中に更新があった（世代が変わった）場合、結果は古い可能性が
+    あるため反映しない。
+    """
+    snapshot = fetch_words_snapshot(get_notion_client(),
+                                    state.workbook.words_db_id)
+    with state.lock:
+        if generation != state.generation:
+            logger.info("workbook %s: discarded words fetched before an "
+                        "update", state.workbook.id)
+            return
+        sync_snapshot(state, snapshot)
+        state.snapshot_generation = generation
+
+
+def start_words_fetch(state):
+    """ワークブックの単語データの取得をバックグラウンドで開始
+
+    現在の世代の取得が実行中であればそのFutureを返す。取得は再実行の
+    レイテンシ予算に関係なく最後まで続け、結果はstate.snapshotに入る。
+    """
+    with state.lock:
+        future = state.fetching
+        if (future is None or future.done()
+                or state.fetch_generation != state.generation):
+            state.fetch_generation = state.generation
+            future = state.fetching = get_fetch_executor().submit(
+                fetch_workbook_words, state, state.generation)
+    return future
+
+
+def load_words_snapshot(workbook, budget=None):
+    """ワークブックの単語スナップショットを取得
+
+    最新のスナップショットがあればそのまま返す。古ければ取得を始め、
+    完了をbudgetの残り時間まで待つ。間に合わない場合や、Notionが
+    失敗している・ブレーカーが開いている場合は、最後に取得に成功した
+    スナップショットを読み取り専用で返す（取得中なら次の再実行で使われる）。
+    """
+    state = get_workbook_state(workbook)
+    if is_fresh(state):
+        return WordsLoad(state.snapshot, False, False)
+
+    future = start_words_fetch(state)
+    timeout = None if budget is None else max(0.0, budget.remaining())
     try:
-        # 全データを取得
-        all_results = []
-        has_more = True
-        start_cursor = None
-
-        while has_more:
-            query_params = {
-                "database_id": words_db_id,
-                "page_size": 100
-            }
-            if start_cursor:
-                query_params["start_cursor"] = start_cursor
-
-            result = notion.databases.query(**query_params)
-            all_results.extend(result['results'])
-            has_more = result['has_more']
-            start_cursor = result.get('next_cursor')
-
-        # データを整理
-        words_data = []
-        for page in all_results:
-            word_text = ""
-            section = None
-            status = None
-            example_sentence = ""
-            example_no = None
-
-            for prop_name, prop_value in page['properties'].items():
-                prop_type = prop_value.get('type')
-
-                if prop_type == 'title':
-                    # Word (title) - 単語
-                    title_content = prop_value.get('title')
-                    if title_content and len(title_content) > 0:
-                        word_parts = []
-                        for text_element in title_content:
-                            if text_element.get('plain_text'):
-                                word_parts.append(text_element['plain_text'])
-                        word_text = ''.join(word_parts).strip()
-
-                elif prop_type == 'relation':
-                    # Example No (relation) - スキップ（パフォーマンス改善のため）
-                    pass
-
-                elif prop_type == 'rollup':
-                    # Section, Example sentence (rollup)
-                    rollup_result = prop_value.get('rollup', {})
-
-                    if rollup_result.get('type') == 'array':
-                        # rollupが配列の場合
-                        array_data = rollup_result.get('array', [])
-                        if array_data and len(array_data) > 0:
-                            first_item = array_data[0]
-
-                            if first_item.get('type') == 'number':
-                                number_value = first_item.get('number')
-                                if number_value is not None:
-                                    if prop_name == 'Section':
-                                        section = int(number_value)
-                                    elif prop_name == 'Example No':
-                                        example_no = int(number_value)
-
-                            elif first_item.get('type') == 'title':
-                                # Example No (rollup) - titleタイプからExample Noを取得
-                                if prop_name == 'Example No':
-                                    title_data = first_item.get('title', [])
-                                    if title_data:
-                                        title_parts = []
-                                        for text_element in title_data:
-                                            if text_element.get('plain_text'):
-                                                title_parts.append(
-                                                    text_element['plain_text']
-                                                )
-                                        title_text = ''.join(title_parts).strip()
-                                        if title_text.isdigit():
-                                            example_no = int(title_text)
-
-                            elif first_item.get('type') == 'rich_text':
-                                # Example sentence (rollup) - 例文をrollupから取得
-                                if prop_name == 'Example sentence':
-                                    rich_text_data = first_item.get('rich_text', [])
-                                    if rich_text_data:
-                                        sentence_parts = []
-                                        for text_element in rich_text_data:
-                                            if text_element.get('plain_text'):
-                                                sentence_parts.append(
-                                                    text_element['plain_text']
-                                                )
-                                        example_sentence = ''.join(
-                                            sentence_parts
-                                        ).strip()
-
-                    elif rollup_result.get('type') == 'number':
-                        # rollupが直接数値の場合
-                        number_value = rollup_result.get('number')
-                        if number_value is not None:
-                            if prop_name == 'Section':
-                                section = int(number_value)
-                            elif prop_name == 'Example No':
-                                example_no = int(number_value)
-
-                elif prop_type == 'status':
-                    # Status
-                    if prop_name == 'Status':
-                        status_obj = prop_value.get('status')
-                        if status_obj:
-                            status = status_obj.get('name', '')
-
-            # 未習得の単語のみを取得 (Statusが"Mastered"でないもの)
-            if word_text and status != "Mastered":
-                words_data.append({
-                    'Section': section,
-                    'Word': word_text,
-                    'Status': status,
-                    'example_sentence': example_sentence,  # rollupから取得した例文
-                    'example_no': example_no,  # rollupから取得したExample No
-                    'page_id': page['id']
-                })
-
-        return words_data
-
+        future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        return WordsLoad(state.snapshot, True, True)
     except Exception as e:
-        st.error(f"データ取得エラー: {e}")
-        return []
+        if state.snapshot is None:
+            st.error(f"データ取得エラー: {e}")
+        return WordsLoad(state.snapshot, True, False)
+
+    if is_fresh(state):
+        return WordsLoad(state.snapshot, False, False)
+    # 待っている間に更新があり、取得結果は使われなかった
+    start_words_fetch(state)
+    return WordsLoad(state.snapshot, True, True)
+
+
+def refresh_workbooks(workbooks):
+    """複数のワークブックの再取得をバックグラウンドで並行に開始
+
+    完了は待たない。結果（失敗した場合は読み取り専用の表示）は以降の
+    再実行でload_words_snapshot()が拾う。
+    """
+    for workbook in workbooks:
+        state = get_workbook_state(workbook)
+        invalidate_words(state)
+        start_words_fetch(state)
+
+
+def sync_snapshot(state, snapshot):
+    """新しく取得したスナップショットを保存し、その集計で進捗を初期化
+
+    前のスナップショットとの差分を求めてstate.diffに保存し、変更件数を
+    ログに出す。state.lockを取得して呼ぶこと。
+    """
+    previous = state.snapshot
+    if previous is not None and previous.fetched_at < snapshot.fetched_at:
+        diff = diff_snapshots(previous, snapshot)
+        state.diff = diff
+        logger.info("workbook %s refreshed: %s", state.workbook.id,
+                    ", ".join(f"{kind}={count}"
+                              for kind, count in diff.counts().items()))
+    state.snapshot = snapshot
+    tracker = state.tracker
+    if tracker.synced_at == snapshot.fetched_at:
+        return
+    tracker.reset(snapshot.progress, snapshot.fetched_at)
+    record_progress(state)
+
+
+def record_progress(state):
+    """今日の進捗を履歴ファイルに記録"""
+    try:
+        state.history.record(state.tracker.sections())
+    except OSError as e:
+        st.warning(f"進捗履歴の保存エラー: {e}")
 
 
-def update_word_status(page_id, new_status):
-    """単語のステータスを更新"""
+def update_word_status(workbook, page_id, new_status, old_status=None,
+                       section=None):
+    """単語のステータスを更新（old_status・sectionがあれば進捗にも反映）"""
     try:
         notion = get_notion_client()
 
         # ステータスプロパティを更新
-        notion.pages.update(
-            page_id=page_id,
-            properties={
-                "Status": {
-                    "status": {
-                        "name": new_status
-                    }
-                }
-            }
-        )
-
-        # キャッシュをクリア
-        get_words_data.clear()
+        notion.update_status(page_id, new_status)
+        state = get_workbook_state(workbook)
+
+        # 進捗集計を更新
+        if old_status is not None:
+            state.tracker.move(section, old_status, new_status)
+            record_progress(state)
+
+        # このワークブックのスナップショットを古いものとし、取得中の結果も捨てる
+        invalidate_words(state)
 
         return True
 
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Section別の学習進捗の集計と日次履歴
+"""
+
+import csv
+import datetime
+import os
+import threading
+from pathlib import Path
+
+# 集計対象の学習ステータス
+STATUSES = ('Not Sure', 'Seen It', 'Almost There', 'Mastered')
+
+# 履歴ファイルの列
+HISTORY_HEADER = ('date', 'section') + STATUSES
+
+# 置き換え済みの行がこの数と有効な行数の両方を超えたら履歴ファイルを書き直す
+COMPACT_MIN_ROWS = 1000
+
+
+def count_statuses(progress, section, status, delta=1):
+    """progress[section][status]をdeltaだけ増減"""
+    if status not in STATUSES:
+        return
+    counts = progress.setdefault(section, dict.fromkeys(STATUSES, 0))
+    counts[status] = max(0, counts[status] + delta)
+
+
+def history_row(day, section, counts):
+    """履歴ファイルの1行"""
+    return ((day, '' if section is None else section)
+            + tuple(counts[status] for status in STATUSES))
+
+
+class ProgressTracker:
+    """Section別・ステータス別の単語数
+
+    全件取得のたびに集計し直すのではなく、取得時の集計で初期化し、
+    ステータス更新に合わせて増減させる。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.progress = {}
+        self.synced_at = None  # 初期化に使ったスナップショットの取得時刻
+
+    def reset(self, progress, synced_at):
+        """取得時の集計で置き換える"""
+        with self.lock:
+            self.progress = {section: dict(counts)
+                             for section, counts in progress.items()}
+            self.synced_at = synced_at
+
+    def move(self, section, old_status, new_status):
+        """1単語のステータス変更を反映"""
+        with self.lock:
+            count_statuses(self.progress, section, old_status, -1)
+            count_statuses(self.progress, section, new_status, 1)
+
+    def sections(self):
+        """Sectionごとの件数（Section順、NoneのSectionは最後）"""
+        with self.lock:
+            return sorted(
+                ((section, dict(counts))
+                 for section, counts in self.progress.items()),
+                key=lambda item: (item[0] is None, item[0] or 0)
+            )
+
+    def totals(self):
+        """全Sectionの合計件数"""
+        totals = dict.fromkeys(STATUSES, 0)
+        for _, counts in self.sections():
+            for status in STATUSES:
+                totals[status] += counts[status]
+        return totals
+
+
+class ProgressHistory:
+    """日次の進捗スナップショットを保存するCSVファイル
+
+    1行が (日付, Section, ステータス別件数) で、同じ日・Sectionの行は後の
+    行で置き換わる（全件数が0の行はそのSectionの削除）。記録時は変化した
+    Sectionの行だけを追記し、置き換え済みの行が増えたらファイル全体を
+    一時ファイル経由で書き直す。ファイル全体をメモリに保持する。
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.file_rows = 0  # ファイル中のデータ行数（置き換え済みを含む）
+        self.days = self.load()
+        self.live_rows = sum(len(entry) for entry in self.days.values())
+
+    def load(self):
+        """ファイルから {日付: {Section: 件数dict}} を読み込む"""
+        days = {}
+        if not self.path.exists():
+            return days
+        with open(self.path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.file_rows += 1
+                section = int(row['section']) if row['section'] else None
+                counts = {status: int(row[status] or 0) for status in STATUSES}
+                entry = days.setdefault(row['date'], {})
+                if any(counts.values()):
+                    entry[section] = counts
+                else:
+                    entry.pop(section, None)
+        return {day: entry for day, entry in days.items() if entry}
+
+    def save(self):
+        """ファイル全体を書き直す"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(HISTORY_HEADER)
+            for day in sorted(self.days):
+                for section, counts in self.days[day].items():
+                    writer.writerow(history_row(day, section, counts))
+        os.replace(tmp_path, self.path)
+        self.file_rows = self.live_rows
+
+    def append(self, rows):
+        """ファイルの末尾に行を追加"""
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+        self.file_rows += len(rows)
+
+    def record(self, sections, day=None):
+        """その日の進捗を記録（変化したSectionの行だけを書き込む）"""
+        day = (day or datetime.date.today()).isoformat()
+        entry = {section: dict(counts) for section, counts in sections
+                 if any(counts.values())}
+        with self.lock:
+            previous = self.days.get(day, {})
+            if previous == entry:
+                return
+            rows = [history_row(day, section, counts)
+                    for section, counts in entry.items()
+                    if previous.get(section) != counts]
+            rows += [history_row(day, section, dict.fromkeys(STATUSES, 0))
+                     for section in previous if section not in entry]
+            self.days[day] = entry
+            self.live_rows += len(entry) - len(previous)
+
+            stale_rows = self.file_rows + len(rows) - self.live_rows
+            if (not self.path.exists()
+                    or stale_rows > max(COMPACT_MIN_ROWS, self.live_rows)):
+                self.save()
+            else:
+                self.append(rows)
+
+    def daily_totals(self):
+        """日付ごとの全Section合計 [(日付, 件数dict), ...]"""
+        with self.lock:
+            days = sorted(self.days.items())
+        totals = []
+        for day, entry in days:
+            counts = dict.fromkeys(STATUSES, 0)
+            for section_counts in entry.values():
+                for status in STATUSES:
+                    counts[status] += section_counts[status]
+            totals.append((day, counts))
+        return totals
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+単語レコードのモデルとNotionページの解析
+"""
+
+import hashlib
+import sys
+import time
+import uuid
+from typing import NamedTuple
+
+import pandas as pd
+
+from .progress import count_statuses
+
+# DataFrameの列名とWordRecordの属性の対応
+COLUMNS = (
+    ('Section', 'section'),
+    ('Word', 'word'),
+    ('Status', 'status'),
+    ('example_sentence', 'example_sentence'),
+    ('example_no', 'example_no'),
+    ('page_id', 'page_id'),
+)
+
+
+def intern_value(value):
+    """繰り返し現れる文字列をインターンして共有する"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def pack_page_id(page_id):
+    """ページIDを128bit整数に詰める（UUIDでない場合はそのまま）"""
+    if isinstance(page_id, str):
+        try:
+            return uuid.UUID(page_id).int
+        except ValueError:
+            return page_id
+    return page_id
+
+
+def unpack_page_id(packed):
+    """詰めたページIDをハイフン付きのUUID文字列に戻す"""
+    if isinstance(packed, int):
+        return str(uuid.UUID(int=packed))
+    return packed
+
+
+class WordRecord:
+    """単語1件分のコンパクトなレコード
+
+    作成後は変更しない。スナップショット同士の差分で比べるため、
+    ステータス以外の内容のハッシュを作成時に1度だけ求めて持つ。
+    """
+
+    __slots__ = ('section', 'word', 'status', 'example_sentence',
+                 'example_no', '_page_id', 'text_hash')
+
+    def __init__(self, section, word, status, example_sentence='',
+                 example_no=None, page_id=None, text_hash=None):
+        self.section = section
+        self.word = word
+        # Statusは全行で同じ値が繰り返されるためインターンする
+        self.status = intern_value(status)
+        self.example_sentence = example_sentence
+        self.example_no = example_no
+        self._page_id = pack_page_id(page_id)
+        if text_hash is None:
+            # ステータス以外の内容のハッシュ（プロセスをまたいで安定）
+            text_hash = stable_hash((section, word, example_sentence,
+                                     example_no))
+        self.text_hash = text_hash
+
+    @property
+    def page_id(self):
+        """ハイフン付きのページID"""
+        return unpack_page_id(self._page_id)
+
+    def __reduce__(self):
+        # pickle時も詰めた状態のまま保存する
+        return (_restore_record, (self.section, self.word, self.status,
+                                  self.example_sentence, self.example_no,
+                                  self._page_id, self.text_hash))
+
+    def __eq__(self, other):
+        if not isinstance(other, WordRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"WordRecord(section={self.section!r}, word={self.word!r}, "
+                f"status={self.status!r}, page_id={self.page_id!r})")
+
+    def to_dict(self):
+        """従来のdict形式に変換"""
+        return {column: getattr(self, attr) for column, attr in COLUMNS}
+
+
+def stable_hash(values):
+    """str・int・Noneのタプルから64bitのハッシュを作成
+
+    組み込みのhash()は文字列のハッシュがプロセスごとに変わるため使わない。
+    """
+    digest = hashlib.blake2b(repr(values).encode('utf-8'), digest_size=8)
+    return int.from_bytes(digest.digest(), 'big')
+
+
+def _restore_record(section, word, status, example_sentence, example_no,
+                    packed_page_id, text_hash):
+    """pickleからWordRecordを復元"""
+    record = WordRecord(section, word, status, example_sentence, example_no,
+                        text_hash=text_hash)
+    record._page_id = packed_page_id
+    return record
+
+
+class WordSnapshot(NamedTuple):
+    """ある時点で取得した単語レコード一式"""
+    records: list
+    fetched_at: float  # 取得時刻（UNIX時間）
+    progress: dict  # Section別・ステータス別の件数（Masteredを含む）
+    timings: dict = None  # 取得のステージ別の時間（秒）
+
+
+class SnapshotDiff(NamedTuple):
+    """2つのWordSnapshotの差分
+
+    スナップショットは未習得の単語のみを持つため、Masteredになった単語は
+    removedに入る。1つのページがstatus_changedとtext_changedの両方に
+    入ることがある。
+    """
+    old_fetched_at: float
+    new_fetched_at: float
+    added: list  # 新しく現れたWordRecord
+    removed: list  # なくなったWordRecord（古い側）
+    status_changed: list  # (古いWordRecord, 新しいWordRecord)
+    text_changed: list  # (古いWordRecord, 新しいWordRecord)
+
+    @property
+    def is_empty(self):
+        """変更がないか"""
+        return not (self.added or self.removed or self.status_changed
+                    or self.text_changed)
+
+    def counts(self):
+        """種類ごとの変更件数"""
+        return {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'status_changed': len(self.status_changed),
+            'text_changed': len(self.text_changed),
+        }
+
+
+def diff_snapshots(old, new):
+    """oldからnewへの変更をページIDで突き合わせて求める"""
+    old_records = {record._page_id: record for record in old.records}
+    added = []
+    status_changed = []
+    text_changed = []
+
+    for record in new.records:
+        previous = old_records.pop(record._page_id, None)
+        if previous is None:
+            added.append(record)
+            continue
+        if previous.status != record.status:
+            status_changed.append((previous, record))
+        if previous.text_hash != record.text_hash:
+            text_changed.append((previous, record))
+
+    return SnapshotDiff(
+        old_fetched_at=old.fetched_at,
+        new_fetched_at=new.fetched_at,
+        added=added,
+        removed=list(old_records.values()),
+        status_changed=status_changed,
+        text_changed=text_changed
+    )
+
+
+def records_to_dataframe(records):
+    """WordRecordのリストをアプリが使うDataFrameに変換"""
+    return pd.DataFrame(
+        {column: [getattr(record, attr) for record in records]
+         for column, attr in COLUMNS},
+        columns=[column for column, _ in COLUMNS]
+    )
+
+
+def join_plain_text(text_elements):
+    """rich_text/title配列のplain_textを連結"""
+    if not text_elements:
+        return ""
+    parts = []
+    for text_element in text_elements:
+        if text_element.get('plain_text'):
+            parts.append(text_element['plain_text'])
+    return ''.join(parts).strip()
+
+
+def parse_sentence_page(page):
+    """SentencesデータベースのページからExample sentence（rich_text）を取得"""
+    example_sentence_prop = page['properties'].get('Example sentence')
+    is_rich_text = (
+        example_sentence_prop and
+        example_sentence_prop.get('type') == 'rich_text'
+    )
+    if is_rich_text:
+        return join_plain_text(example_sentence_prop.get('rich_text', []))
+    return ""
+
+
+def parse_word_page(page):
+    """WordsデータベースのページをWordRecordに変換（単語が空ならNone）"""
+    word_text = ""
+    section = None
+    status = None
+    example_sentence = ""
+    example_no = None
+
+    for prop_name, prop_value in page['properties'].items():
+        prop_type = prop_value.get('type')
+
+        if prop_type == 'title':
+            # Word (title) - 単語
+            word_text = join_plain_text(prop_value.get('title'))
+
+        elif prop_type == 'relation':
+            # Example No (relation) - スキップ（パフォーマンス改善のため）
+            pass
+
+        elif prop_type == 'rollup':
+            # Section, Example sentence (rollup)
+            rollup_result = prop_value.get('rollup', {})
+
+            if rollup_result.get('type') == 'array':
+                # rollupが配列の場合
+                array_data = rollup_result.get('array', [])
+                if array_data and len(array_data) > 0:
+                    first_item = array_data[0]
+
+                    if first_item.get('type') == 'number':
+                        number_value = first_item.get('number')
+                        if number_value is not None:
+                            if prop_name == 'Section':
+                                section = int(number_value)
+                            elif prop_name == 'Example No':
+                                example_no = int(number_value)
+
+                    elif first_item.get('type') == 'title':
+                        # Example No (rollup) - titleタイプからExample Noを取得
+                        if prop_name == 'Example No':
+                            title_text = join_plain_text(
+                                first_item.get('title', []))
+                            if title_text.isdigit():
+                                example_no = int(title_text)
+
+                    elif first_item.get('type') == 'rich_text':
+                        # Example sentence (rollup) - 例文をrollupから取得
+                        if prop_name == 'Example sentence':
+                            example_sentence = join_plain_text(
+                                first_item.get('rich_text', []))
+
+            elif rollup_result.get('type') == 'number':
+                # rollupが直接数値の場合
+                number_value = rollup_result.get('number')
+                if number_value is not None:
+                    if prop_name == 'Section':
+                        section = int(number_value)
+                    elif prop_name == 'Example No':
+                        example_no = int(number_value)
+
+        elif prop_type == 'status':
+            # Status
+            if prop_name == 'Status':
+                status_obj = prop_value.get('status')
+                if status_obj:
+                    status = status_obj.get('name', '')
+
+    if not word_text:
+        return None
+
+    return WordRecord(
+        section=section,
+        word=word_text,
+        status=status,
+        example_sentence=example_sentence,  # rollupから取得した例文
+        example_no=example_no,  # rollupから取得したExample No
+        page_id=page['id']
+    )
+
+
+class SnapshotBuilder:
+    """取得したページを順に解析してWordSnapshotを組み立てる"""
+
+    def __init__(self):
+        self.records = []
+        self.progress = {}
+
+    def add_pages(self, pages):
+        """ページを解析して追加"""
+        for page in pages:
+            record = parse_word_page(page)
+            if record is None:
+                continue
+            # 進捗はMasteredを含めて集計する
+            count_statuses(self.progress, record.section, record.status)
+            # 未習得の単語のみを取得 (Statusが"Mastered"でないもの)
+            if record.status != "Mastered":
+                self.records.append(record)
+
+    def build(self):
+        """WordSnapshotを作成"""
+        return WordSnapshot(records=self.records, fetched_at=time.time(),
+                            progress=self.progress)
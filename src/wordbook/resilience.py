@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Notion呼び出しのサーキットブレーカーとレイテンシ予算
+"""
+
+import asyncio
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """サーキットブレーカーが開いているため呼び出しを行わなかった"""
+
+
+class CircuitBreaker:
+    """連続した失敗でNotionへの呼び出しを一時的に止めるブレーカー
+
+    closed: 通常どおり呼び出す
+    open: failure_threshold回連続で失敗した後、reset_timeout秒間は呼び出さない
+    half_open: reset_timeout経過後、試しに1回だけ呼び出す
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self):
+        """現在の状態"""
+        with self.lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """呼び出してよいか判定（half_openでは1回だけ許可）"""
+        with self.lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        """呼び出しの成功を記録してブレーカーを閉じる"""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        """呼び出しの失敗を記録し、しきい値に達したらブレーカーを開く"""
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self.probing = False
+
+    def call(self, func, *args, **kwargs):
+        """ブレーカー越しにfuncを呼び出す"""
+        if not self.allow():
+            raise CircuitOpenError("Notion API is temporarily unavailable")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    async def call_async(self, func, *args, **kwargs):
+        """ブレーカー越しにコルーチン関数funcを呼び出す
+
+        タイムアウトなどでキャンセルされた呼び出しも失敗として数える。
+        """
+        if not self.allow():
+            raise CircuitOpenError("Notion API is temporarily unavailable")
+        try:
+            result = await func(*args, **kwargs)
+        except (Exception, asyncio.CancelledError):
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+class LatencyBudget:
+    """1回の再実行でNotionからの応答を待てる時間の予算"""
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.seconds = seconds
+        self.clock = clock
+        self.started_at = clock()
+
+    def remaining(self):
+        """残り時間（秒）"""
+        return self.seconds - (self.clock() - self.started_at)
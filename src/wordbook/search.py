@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+単語検索インデックス（前方一致・トライグラム）
+"""
+
+import bisect
+import copy
+import threading
+from array import array
+from typing import NamedTuple
+
+# 1ページあたりの件数の上限
+MAX_PAGE_SIZE = 200
+
+
+class SearchResult(NamedTuple):
+    """検索結果の1ページ分"""
+    rows: list  # テーブル上の行位置
+    total: int  # 条件に一致した全件数
+    page: int  # 0始まりのページ番号
+    page_count: int
+
+
+def normalize(text):
+    """検索用に文字列を正規化"""
+    return ' '.join(str(text).split()).casefold()
+
+
+def trigrams(text):
+    """文字列のトライグラム集合"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def optional_int(value):
+    """数値をintに変換（None・NaNはNone）"""
+    if value is None or value != value:
+        return None
+    return int(value)
+
+
+def format_key(section, example_no):
+    """Section-Noのキー文字列を作成（例: 12-3）"""
+    section = '?' if section is None else section
+    example_no = '?' if example_no is None else example_no
+    return f"{section}-{example_no}"
+
+
+def insert_sorted(rows, row):
+    """ソート済みの行位置リストにrowを挿入"""
+    rows.insert(bisect.bisect_left(rows, row), row)
+
+
+def remove_sorted(rows, item):
+    """ソート済みのリストからitemを削除"""
+    position = bisect.bisect_left(rows, item)
+    if position < len(rows) and rows[position] == item:
+        del rows[position]
+
+
+def intersect(rows_a, rows_b):
+    """ソート済みの行位置リスト同士の共通部分"""
+    if len(rows_a) > len(rows_b):
+        rows_a, rows_b = rows_b, rows_a
+    members = set(rows_b)
+    return [row for row in rows_a if row in members]
+
+
+class WordIndex:
+    """Word・Section-Noキーに対する検索インデックス
+
+    行位置はソート済みテーブルの並び順に対応し、検索結果もその順で返す。
+    データのバージョンごとに1度だけ構築し、変更のあった行だけを
+    update_row・remove_rowで更新する（削除した行の位置は詰めない）。
+    """
+
+    def __init__(self, words, sections, example_nos, statuses):
+        self.lock = threading.Lock()
+        self.sections_by_row = [optional_int(section) for section in sections]
+        self.statuses = list(statuses)
+        example_nos = [optional_int(example_no) for example_no in example_nos]
+        self.words = [normalize(word) for word in words]
+        self.keys = [format_key(section, example_no)
+                     for section, example_no
+                     in zip(self.sections_by_row, example_nos)]
+        self.size = len(self.words)
+        self.removed = set()
+
+        # 前方一致用のソート済み (文字列, 行位置) リスト
+        self.sorted_words = sorted(
+            (word, row) for row, word in enumerate(self.words))
+        self.sorted_keys = sorted(
+            (key, row) for row, key in enumerate(self.keys))
+
+        # 部分一致用のトライグラム転置インデックス
+        self.trigram_rows = {}
+        for row, word in enumerate(self.words):
+            for gram in trigrams(word):
+                self.trigram_rows.setdefault(gram, array('I')).append(row)
+
+        # 絞り込み用のSection・Status別の行位置
+        self.section_rows = {}
+        self.status_rows = {}
+        for row, (section, status) in enumerate(zip(self.sections_by_row,
+                                                    self.statuses)):
+            self.section_rows.setdefault(section, array('I')).append(row)
+            self.status_rows.setdefault(status, array('I')).append(row)
+
+    @property
+    def count(self):
+        """削除した行を除いた件数"""
+        return self.size - len(self.removed)
+
+    @property
+    def sections(self):
+        """インデックス内のSection一覧（None以外）"""
+        return sorted(section for section, rows in self.section_rows.items()
+                      if section is not None and rows)
+
+    def copy(self):
+        """更新用の複製（検索構造を共有しない）"""
+        with self.lock:
+            clone = copy.copy(self)
+            clone.lock = threading.Lock()
+            clone.sections_by_row = list(self.sections_by_row)
+            clone.statuses = list(self.statuses)
+            clone.words = list(self.words)
+            clone.keys = list(self.keys)
+            clone.removed = set(self.removed)
+            clone.sorted_words = list(self.sorted_words)
+            clone.sorted_keys = list(self.sorted_keys)
+            clone.trigram_rows = {gram: array('I', rows)
+                                  for gram, rows in self.trigram_rows.items()}
+            clone.section_rows = {section: array('I', rows) for section, rows
+                                  in self.section_rows.items()}
+            clone.status_rows = {status: array('I', rows)
+                                 for status, rows in self.status_rows.items()}
+        return clone
+
+    def unindex_row(self, row):
+        """rowをすべての検索構造から外す"""
+        word = self.words[row]
+        remove_sorted(self.sorted_words, (word, row))
+        remove_sorted(self.sorted_keys, (self.keys[row], row))
+        for gram in trigrams(word):
+            remove_sorted(self.trigram_rows[gram], row)
+        remove_sorted(self.section_rows[self.sections_by_row[row]], row)
+        remove_sorted(self.status_rows[self.statuses[row]], row)
+
+    def index_row(self, row, word, section, example_no, status):
+        """rowを新しい値ですべての検索構造に加える"""
+        section = optional_int(section)
+        word = normalize(word)
+        key = format_key(section, optional_int(example_no))
+        self.words[row] = word
+        self.keys[row] = key
+        self.sections_by_row[row] = section
+        self.statuses[row] = status
+        insert_sorted(self.sorted_words, (word, row))
+        insert_sorted(self.sorted_keys, (key, row))
+        for gram in trigrams(word):
+            insert_sorted(self.trigram_rows.setdefault(gram, array('I')), row)
+        insert_sorted(self.section_rows.setdefault(section, array('I')), row)
+        insert_sorted(self.status_rows.setdefault(status, array('I')), row)
+
+    def update_row(self, row, word, section, example_no, status):
+        """1行の値を置き換える"""
+        with self.lock:
+            self.unindex_row(row)
+            self.index_row(row, word, section, example_no, status)
+
+    def remove_row(self, row):
+        """1行を検索対象から外す"""
+        with self.lock:
+            if row not in self.removed:
+                self.unindex_row(row)
+                self.removed.add(row)
+
+    def prefix_rows(self, sorted_pairs, prefix):
+        """前方一致する行位置の集合"""
+        start = bisect.bisect_left(sorted_pairs, (prefix, -1))
+        rows = set()
+        for text, row in sorted_pairs[start:]:
+            if not text.startswith(prefix):
+                break
+            rows.add(row)
+        return rows
+
+    def substring_rows(self, query):
+        """Wordに部分一致する行位置の集合"""
+        if len(query) < 3:
+            # トライグラムが作れない短い検索語は前方一致のみ
+            return self.prefix_rows(self.sorted_words, query)
+
+        postings = []
+        for gram in trigrams(query):
+            rows = self.trigram_rows.get(gram)
+            if rows is None:
+                return set()
+            postings.append(rows)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for rows in postings[1:]:
+            candidates.intersection_update(rows)
+        return {row for row in candidates if query in self.words[row]}
+
+    def filter_rows(self, section=None, status=None):
+        """Section・Statusで絞り込んだ行位置（Noneは絞り込みなし）"""
+        rows = None
+        if section is not None:
+            rows = list(self.section_rows.get(section, ()))
+        if status is not None:
+            status_rows = list(self.status_rows.get(status, ()))
+            rows = status_rows if rows is None else intersect(rows,
+                                                              status_rows)
+        return rows
+
+    def match(self, query='', section=None, status=None):
+        """条件に一致する全行位置（前方一致を先、以降は行順）"""
+        with self.lock:
+            return self.match_rows(normalize(query), section, status)
+
+    def match_rows(self, query, section, status):
+        """matchの本体（正規化済みの検索語、ロック内で呼ぶ）"""
+        allowed = self.filter_rows(section, status)
+
+        if not query:
+            if allowed is not None:
+                return allowed
+            if self.removed:
+                return [row for row in range(self.size)
+                        if row not in self.removed]
+            return list(range(self.size))
+
+        prefix = self.prefix_rows(self.sorted_words, query)
+        prefix |= self.prefix_rows(self.sorted_keys, query)
+        matched = prefix | self.substring_rows(query)
+        if allowed is not None:
+            matched.intersection_update(allowed)
+
+        return sorted(matched, key=lambda row: (row not in prefix, row))
+
+    def search(self, query='', section=None, status=None, page=0,
+               page_size=50):
+        """検索してpage番目のページを返す"""
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        matched = self.match(query, section, status)
+        total = len(matched)
+        page_count = max(1, -(-total // page_size))
+        page = max(0, min(page, page_count - 1))
+        start = page * page_size
+        return SearchResult(
+            rows=matched[start:start + page_size],
+            total=total,
+            page=page,
+            page_count=page_count
+        )
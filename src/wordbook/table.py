@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+アプリの単語テーブル（ソート済みDataFrame・選択肢ラベル・検索インデックス）
+"""
+
+# 1度に削除できる行の割合（超えたら作り直して行位置を詰める）
+MAX_REMOVED_RATIO = 0.25
+
+
+class WordTable:
+    """スナップショットから作った単語テーブル
+
+    新しいスナップショットとの差分が行の置き換えと削除だけであれば、
+    複製したテーブルで変更のあった行のセル・ラベル・インデックスだけを
+    更新する。行位置は変わらないため、セッションが保持している選択中の
+    行も有効なまま残る。一度作ったテーブルは変更しないため、ロックなしで
+    読み取れる。
+    """
+
+    def __init__(self, snapshot, sorted_df, options, index, rows=None):
+        self.snapshot = snapshot
+        self.sorted_df = sorted_df
+        self.options = options
+        self.index = index
+        if rows is None:
+            rows = dict(zip(sorted_df['page_id'], range(len(sorted_df))))
+        self.rows = rows
+
+    @property
+    def fetched_at(self):
+        """テーブルの元になったスナップショットの取得時刻"""
+        return self.snapshot.fetched_at
+
+    def can_apply(self, diff):
+        """差分を反映できるか（行の追加・並び順の変更がないか）"""
+        if diff.added or diff.old_fetched_at != self.fetched_at:
+            return False
+        for old, new in diff.text_changed:
+            # Section（ソートキー）・Noの変更はラベルと並び順が変わる
+            if (old.section, old.example_no) != (new.section, new.example_no):
+                return False
+        removed = len(self.index.removed) + len(diff.removed)
+        return removed <= MAX_REMOVED_RATIO * self.index.size
+
+    def apply(self, diff, snapshot, format_option):
+        """差分を反映した新しいテーブルを返す（反映できない場合はNone）"""
+        if not self.can_apply(diff):
+            return None
+
+        sorted_df = self.sorted_df.copy()
+        options = list(self.options)
+        index = self.index.copy()
+        rows = dict(self.rows)
+
+        for record in diff.removed:
+            index.remove_row(rows.pop(record.page_id))
+
+        changed = {new.page_id: new
+                   for _, new in diff.status_changed + diff.text_changed}
+        columns = {column: sorted_df.columns.get_loc(column)
+                   for column in ('Section', 'example_no', 'Word',
+                                  'Status', 'example_sentence')}
+        for page_id, record in changed.items():
+            row = rows[page_id]
+            sorted_df.iat[row, columns['Word']] = record.word
+            sorted_df.iat[row, columns['Status']] = record.status
+            sorted_df.iat[row, columns['example_sentence']] = (
+                record.example_sentence)
+            # Section・Noは変わらないため、ラベルはテーブルの値で作る
+            options[row] = format_option(
+                sorted_df.iat[row, columns['Section']],
+                sorted_df.iat[row, columns['example_no']],
+                record.status, record.word)
+            index.update_row(row, record.word, record.section,
+                             record.example_no, record.status)
+
+        return WordTable(snapshot, sorted_df, options, index, rows)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+ワークブック（コース・学習者ごとのデータベース一式）の設定と状態管理
+"""
+
+import json
+import os
+import threading
+import time
+from typing import NamedTuple
+
+from .progress import ProgressHistory, ProgressTracker
+
+# ワークブック設定ファイル
+WORKBOOK_CONFIG_PATH = os.getenv("WORDBOOK_CONFIG", "workbooks.json")
+
+
+class Workbook(NamedTuple):
+    """1つのワークブックのデータベースID"""
+    id: str
+    name: str
+    words_db_id: str
+    sentences_db_id: str = None
+
+
+# 設定ファイルがない場合のワークブック
+DEFAULT_WORKBOOK = Workbook(
+    id='default',
+    name='Wordbook',
+    words_db_id="2230dc53-a13b-8007-91d2-c3ed98f8dc95",
+    sentences_db_id="2230dc53-a13b-8055-9c36-cbe6162846ef"
+)
+
+
+def load_workbooks(path=None):
+    """設定ファイルからワークブックを読み込む（{ID: Workbook}、設定順）
+
+    ファイルの形式:
+        {"workbooks": [{"id": "...", "name": "...",
+                        "words_db_id": "...", "sentences_db_id": "..."}]}
+    """
+    path = path or WORKBOOK_CONFIG_PATH
+    if not os.path.exists(path):
+        return {DEFAULT_WORKBOOK.id: DEFAULT_WORKBOOK}
+
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+
+    workbooks = {}
+    for entry in config.get('workbooks', []):
+        workbook = Workbook(
+            id=entry['id'],
+            name=entry.get('name', entry['id']),
+            words_db_id=entry['words_db_id'],
+            sentences_db_id=entry.get('sentences_db_id')
+        )
+        workbooks[workbook.id] = workbook
+
+    if not workbooks:
+        raise ValueError(f"{path}: no workbooks configured")
+    return workbooks
+
+
+def get_workbook(workbook_id=None, path=None):
+    """IDでワークブックを取得（未指定なら最初のワークブック）"""
+    workbooks = load_workbooks(path)
+    if workbook_id is None:
+        return next(iter(workbooks.values()))
+    return workbooks[workbook_id]
+
+
+def per_workbook_path(path):
+    """ワークブックごとの履歴ファイルのパス（{workbook}はワークブックID）
+
+    {workbook}を含まないパスでは、ワークブック同士が同じファイルを
+    上書きし合わないよう、ファイル名の末尾に-{workbook}を付ける。
+    """
+    if '{workbook}' in path:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{{workbook}}{ext}"
+
+
+class WorkbookState:
+    """ワークブックごとの同期状態（最後のスナップショット・進捗・履歴）"""
+
+    def __init__(self, workbook, history_path):
+        self.workbook = workbook
+        self.lock = threading.Lock()
+        # 更新のたびに増やす世代（これより前に始めた取得の結果は使わない）
+        self.generation = 0
+        self.fetching = None  # 単語データの取得（concurrent.futures.Future）
+        self.fetch_generation = None  # fetchingを始めたときの世代
+        self.snapshot = None  # 最後に取得に成功したスナップショット
+        self.snapshot_generation = 0  # snapshotの取得を始めたときの世代
+        self.diff = None  # 1つ前のスナップショットからの差分
+        self.table = None  # スナップショットから作ったアプリの単語テーブル
+        self.tracker = ProgressTracker()
+        self.history = ProgressHistory(history_path)
+        self.last_used = time.monotonic()
+
+
+class WorkbookRegistry:
+    """使用中のワークブックの状態を保持する
+
+    idle_timeout秒使われていないワークブックの状態を破棄してon_evictを呼ぶ。
+    max_active個を超えている間は、min_idle秒以上使われていないものも
+    古い順に破棄する（それより最近使われたワークブックは上限を超えても残す）。
+    破棄したワークブックの最後のスナップショットだけは残し、再び使われた
+    ときに取得が終わるまでの読み取り専用の表示に使う。
+    """
+
+    def __init__(self, history_path_template, max_active=4,
+                 idle_timeout=1800.0, min_idle=300.0, on_evict=None,
+                 clock=time.monotonic):
+        self.history_path_template = per_workbook_path(
+            history_path_template)
+        self.max_active = max_active
+        self.idle_timeout = idle_timeout
+        self.min_idle = min_idle
+        self.on_evict = on_evict
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.states = {}
+        self.snapshots = {}  # 破棄した状態の {ID: (Workbook, スナップショット)}
+
+    def get(self, workbook):
+        """ワークブックの状態を取得（なければ作成）"""
+        with self.lock:
+            state = self.states.get(workbook.id)
+            if state is None or state.workbook != workbook:
+                history_path = self.history_path_template.format(
+                    workbook=workbook.id)
+                state = WorkbookState(workbook, history_path)
+                retained = self.snapshots.pop(workbook.id, None)
+                if retained is not None and retained[0] == workbook:
+                    # 進捗は同期していないため、最新とはみなさず取得し直す
+                    state.snapshot = retained[1]
+                    state.snapshot_generation = None
+                self.states[workbook.id] = state
+            state.last_used = self.clock()
+            evicted = self.select_evictions(keep=workbook.id)
+            for evicted_state in evicted:
+                del self.states[evicted_state.workbook.id]
+                if evicted_state.snapshot is not None:
+                    self.snapshots[evicted_state.workbook.id] = (
+                        evicted_state.workbook, evicted_state.snapshot)
+
+        if self.on_evict is not None:
+            for evicted_state in evicted:
+                self.on_evict(evicted_state.workbook)
+        return state
+
+    def select_evictions(self, keep):
+        """破棄するワークブックの状態を選ぶ（keepは残す）"""
+        now = self.clock()
+        candidates = sorted(
+            (state for workbook_id, state in self.states.items()
+             if workbook_id != keep),
+            key=lambda state: state.last_used
+        )
+        evicted = [state for state in candidates
+                   if now - state.last_used > self.idle_timeout]
+        remaining = len(self.states) - len(evicted)
+        for state in candidates:
+            if remaining <= self.max_active:
+                break
+            if state not in evicted and now - state.last_used > self.min_idle:
+                evicted.append(state)
+                remaining -= 1
+        return evicted
+
+    def active(self):
+        """状態を保持しているワークブックID"""
+        with self.lock:
+            return list(self.states)
@@ -3,28 +3,60 @@
 Streamlit単語帳アプリ - セクション別未習得単語表示
 """
 
+import functools
+import logging
+import os
 import streamlit as st
 import pandas as pd
 import random
+import time
 from src.wordbook.notion_client import (
-    get_words_data,
+    RERUN_LATENCY_BUDGET,
+    load_words_snapshot,
     get_notion_client,
+    get_workbook_registry,
+    get_workbook_state,
+    get_workbooks,
+    refresh_workbooks,
     update_word_status
 )
-from src.wordbook.i18n import get_text, get_available_languages
+from src.wordbook.i18n import (
+    STATUS_EMOJIS,
+    UNKNOWN_STATUS_EMOJI,
+    get_available_languages,
+    get_bundle
+)
+from src.wordbook.progress import STATUSES
+from src.wordbook.records import diff_snapshots, records_to_dataframe
+from src.wordbook.resilience import LatencyBudget
+from src.wordbook.search import WordIndex, optional_int
+from src.wordbook.table import WordTable
+
+# 学習ステータスの選択肢
+ALL_STATUSES = list(STATUSES)
+
+# 単語選択肢の1ページあたりの件数
+WORD_PAGE_SIZE = 50
+
+# データ層（src.wordbook）のログレベル
+LOG_LEVEL = os.getenv("WORDBOOK_LOG_LEVEL", "INFO")
+
+
+def setup_logging():
+    """データ層のログ（取得時間・変更件数など）を標準エラーに出す"""
+    logger = logging.getLogger('src.wordbook')
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
 
 
 def get_status_emoji(status):
     """ステータスに対応するemojiを返す"""
-    status_map = {
-        'Not Sure': '🤔',
-        'Seen It': '👀',
-        'Almost There': '😃',
-        'Mastered': '✅',  # 通常は表示されないが念のため
-        None: '❓',
-        '': '❓'
-    }
-    return status_map.get(status, '❓')
+    return STATUS_EMOJIS.get(status, UNKNOWN_STATUS_EMOJI)
 
 
 def on_word_selection_change():
@@ -35,39 +67,78 @@ def on_word_selection_change():
     st.session_state.selection_changed = True
 
 
-@st.dialog("Confirm Status Update")
-def show_confirmation_dialog(current_status, new_status, page_id, lang):
-    """ステータス更新確認ダイアログ"""
-    current_emoji = get_status_emoji(current_status)
-    new_emoji = get_status_emoji(new_status)
+def on_search_change():
+    """検索条件変更時のコールバック"""
+    # 検索結果の1ページ目に戻す
+    st.session_state.word_search_page = 1
+
+
+def on_workbook_change():
+    """ワークブック切り替え時のコールバック"""
+    # 前のワークブックの選択・検索条件を破棄
+    for key in ('selected_word_index', 'word_search', 'word_section_filter',
+                'word_status_filter', 'show_dialog'):
+        st.session_state.pop(key, None)
+    st.session_state.word_search_page = 1
 
-    st.write(f"**Current:** {current_status} {current_emoji}")
-    st.write(f"**New:** {new_status} {new_emoji}")
+
+def on_refresh_workbooks(lang):
+    """使用中のワークブックの再取得をバックグラウンドで開始"""
+    texts = get_bundle(lang)
+    workbooks = get_workbooks()
+    active = [workbooks[workbook_id]
+              for workbook_id in get_workbook_registry().active()
+              if workbook_id in workbooks]
+    refresh_workbooks(active)
+    st.toast(texts['refresh_started'], icon="🔄")
+
+
+def on_pick_one(word_index, query, section, status):
+    """Pick Oneボタンのコールバック"""
+    # 検索条件に一致する単語からランダムに選択
+    matched = word_index.match(query, section, status)
+    if not matched:
+        return
+    position = random.randrange(len(matched))
+    st.session_state.selected_word_index = matched[position]
+    st.session_state.word_search_page = position // WORD_PAGE_SIZE + 1
+    st.session_state.selection_changed = True
+
+
+def confirmation_dialog(workbook, current_status, new_status, page_id, lang,
+                        section=None):
+    """ステータス更新確認ダイアログの中身"""
+    texts = get_bundle(lang)
+
+    st.write(f"**{texts['current_status']}** "
+             f"{texts.status_label(current_status)}")
+    st.write(f"**{texts['new_status']}** {texts.status_label(new_status)}")
     st.write("")
-    st.write("Are you sure you want to update the status?")
+    st.write(texts['confirm_update_question'])
 
     col1, col2 = st.columns(2)
 
     with col1:
-        if st.button("✅ Yes, Update", use_container_width=True,
+        if st.button(texts['confirm_update'], use_container_width=True,
                      type="primary"):
-            updating_msg = get_text('updating_status', lang)
+            updating_msg = texts['updating_status']
             with st.spinner(updating_msg):
-                success = update_word_status(page_id, new_status)
+                success = update_word_status(workbook, page_id, new_status,
+                                             current_status, section)
 
             if success:
-                success_msg = get_text('status_updated', lang)
+                success_msg = texts['status_updated']
                 st.toast(success_msg, icon="✅")
                 # ダイアログを閉じるためのフラグをクリア
                 if 'show_dialog' in st.session_state:
                     del st.session_state.show_dialog
                 st.rerun()
             else:
-                error_msg = get_text('status_update_error', lang)
+                error_msg = texts['status_update_error']
                 st.error(error_msg)
 
     with col2:
-        if st.button("❌ Cancel", use_container_width=True):
+        if st.button(texts['cancel_update'], use_container_width=True):
             # ダイアログを閉じるためのフラグをクリア
             if 'show_dialog' in st.session_state:
                 del st.session_state.show_dialog
@@ -76,8 +147,264 @@ def show_confirmation_dialog(current_status, new_status, page_id, lang):
             st.rerun()
 
 
+@functools.lru_cache(maxsize=None)
+def get_confirmation_dialog(lang):
+    """言語ごとのタイトルを付けた確認ダイアログ"""
+    return st.dialog(get_bundle(lang)['confirm_status_update'])(
+        confirmation_dialog)
+
+
+def show_confirmation_dialog(workbook, current_status, new_status, page_id,
+                             lang, section=None):
+    """ステータス更新確認ダイアログ"""
+    get_confirmation_dialog(lang)(workbook, current_status, new_status,
+                                  page_id, lang, section)
+
+
+def format_word_option(section, example_no, status, word):
+    """単語選択肢の表示ラベルを作成"""
+    section = section if section is not None else '?'
+    example_no = example_no if example_no is not None else '?'
+    status_emoji = get_status_emoji(status if status else 'Unknown')
+    return f"Section {section}-{example_no}: {status_emoji} {word}"
+
+
+def build_word_options(sorted_df):
+    """ソート済みDataFrameの行順で選択肢ラベルを作成"""
+    return [
+        format_word_option(section, example_no, status, word)
+        for section, example_no, status, word in zip(
+            sorted_df['Section'], sorted_df['example_no'],
+            sorted_df['Status'], sorted_df['Word'])
+    ]
+
+
+def build_word_table(snapshot):
+    """スナップショットから単語テーブルを作成"""
+    # DataFrameに変換
+    df = records_to_dataframe(snapshot.records)
+
+    # ソート済みのリストを作成
+    sorted_df = df.sort_values(['Section'])
+
+    # 単語選択
+    word_options = build_word_options(sorted_df)
+    return WordTable(snapshot, sorted_df, word_options,
+                     build_word_index(sorted_df))
+
+
+def build_word_index(sorted_df):
+    """ソート済みDataFrameの行順で検索インデックスを作成"""
+    return WordIndex(
+        words=sorted_df['Word'],
+        sections=sorted_df['Section'],
+        example_nos=sorted_df['example_no'],
+        statuses=sorted_df['Status']
+    )
+
+
+def get_word_table(workbook, snapshot):
+    """ワークブックの単語テーブルを取得
+
+    ワークブックごとに1つのテーブルを再実行・フラグメント・セッション間で
+    共有する。新しいスナップショットでは差分を求め、変更のあった行だけを
+    更新したテーブルに差し替える（行の追加などで反映できない場合は
+    作り直す）。差し替えはstate.lockの中で行い、テーブル自体は変更しない。
+    """
+    state = get_workbook_state(workbook)
+    with state.lock:
+        table = state.table
+        if table is None:
+            table = state.table = build_word_table(snapshot)
+        elif table.fetched_at < snapshot.fetched_at:
+            # データ層が求めた差分がこのテーブルからのものであれば使い回す
+            diff = state.diff
+            if (diff is None or diff.old_fetched_at != table.fetched_at
+                    or diff.new_fetched_at != snapshot.fetched_at):
+                diff = diff_snapshots(table.snapshot, snapshot)
+            table = (table.apply(diff, snapshot, format_word_option)
+                     or build_word_table(snapshot))
+            state.table = table
+    return table
+
+
+def render_status_update(workbook, word_info, selected_index, lang,
+                         read_only=False):
+    """ステータス更新パネル（読み取り専用モードでは更新不可）"""
+    texts = get_bundle(lang)
+    status = word_info['Status']
+
+    # 現在のステータスのインデックスを取得
+    try:
+        current_index = ALL_STATUSES.index(status)
+    except ValueError:
+        current_index = 0
+
+    # ワークブックごとに別のキーにする（同じ行番号でも別の単語のため）
+    selectbox_key = f"status_update_{workbook.id}_{selected_index}"
+
+    # selectboxリセットフラグをチェック
+    if st.session_state.get('reset_selectbox', False):
+        # リセットフラグをクリア
+        st.session_state.reset_selectbox = False
+        # selectboxのキーをリセットして再描画を促す
+        if selectbox_key in st.session_state:
+            del st.session_state[selectbox_key]
+
+    new_status = st.selectbox(
+        texts['update_status'],
+        options=ALL_STATUSES,
+        format_func=texts.status_label,
+        index=current_index,
+        help=texts['update_status_help'],
+        key=selectbox_key,
+        disabled=read_only
+    )
+
+    if read_only:
+        st.caption(texts['status_update_disabled'])
+        return
+
+    # 現在のステータスと異なる場合、確認ダイアログを表示
+    if (new_status != status and
+            not st.session_state.get('show_dialog', False)):
+        # ダイアログ表示フラグを設定
+        st.session_state.show_dialog = True
+        page_id = word_info['page_id']
+        section = optional_int(word_info['Section'])
+        show_confirmation_dialog(workbook, status, new_status, page_id, lang,
+                                 section)
+
+
+def render_example_sentences(word_info, lang):
+    """例文パネル"""
+    texts = get_bundle(lang)
+    # 例文を表示（rollupから取得した例文を使用）
+    try:
+        example_sentence = word_info.get('example_sentence', '')
+
+        if example_sentence:
+            # 改行で分割して行ごとに処理
+            lines = (example_sentence.replace('\r\n', '\n')
+                     .replace('\r', '\n')
+                     .split('\n'))
+
+            # 例文ブロックを開始
+            style = ("font-size: 18px; line-height: 1.6; "
+                     "margin-bottom: 16px")
+
+            for line in lines:
+                # 各行の余分な空白を除去
+                cleaned_line = ' '.join(line.split())
+                if cleaned_line:  # 空行でない場合のみ表示
+                    div = (f'<div style="{style};">'
+                           f'{cleaned_line}</div>')
+                    st.markdown(div, unsafe_allow_html=True)
+        else:
+            st.info(texts['no_example_sentences'])
+
+    except Exception as e:
+        error_msg = texts['sentence_fetch_error']
+        st.error(f"{error_msg} {e}")
+
+
+def render_refresh_summary(workbook, lang):
+    """直前の再取得での変更件数"""
+    texts = get_bundle(lang)
+    diff = get_workbook_state(workbook).diff
+    if diff is None:
+        return
+    counts = diff.counts()
+    st.caption(f"{texts['last_refresh']} "
+               f"{counts['added']} {texts['changes_added']}, "
+               f"{counts['removed']} {texts['changes_removed']}, "
+               f"{counts['status_changed']} {texts['changes_status']}, "
+               f"{counts['text_changed']} {texts['changes_text']}")
+
+
+def render_fetch_timings(snapshot, lang):
+    """スナップショットの取得にかかった時間（ステージ別）"""
+    texts = get_bundle(lang)
+    seconds = snapshot.timings
+    if not seconds:
+        return
+    st.caption(f"{texts['loaded_in']} {seconds.get('total', 0):.2f}s "
+               f"({texts['stage_fetch']} {seconds.get('fetch', 0):.2f}s, "
+               f"{texts['stage_parse']} {seconds.get('parse', 0):.2f}s, "
+               f"{texts['stage_wait']} {seconds.get('wait', 0):.2f}s)")
+
+
+def render_progress_dashboard(workbook, lang):
+    """Section別の進捗と日ごとの推移
+
+    データ層が保持している集計と履歴を表示するだけで、全件の走査はしない。
+    """
+    texts = get_bundle(lang)
+    state = get_workbook_state(workbook)
+    sections = state.tracker.sections()
+    if not sections:
+        st.info(texts['no_progress_data'])
+        return
+
+    totals = state.tracker.totals()
+    for column, status in zip(st.columns(len(STATUSES)), STATUSES):
+        column.metric(texts.status_label(status), totals[status])
+
+    section_text = texts['section']
+    table = pd.DataFrame(
+        [{section_text: '?' if section is None else section, **counts}
+         for section, counts in sections]
+    ).rename(columns=texts.status_names)
+    st.dataframe(table, hide_index=True, use_container_width=True)
+
+    history = state.history.daily_totals()
+    if len(history) > 1:
+        st.markdown(f"**{texts['progress_trend']}**")
+        trend = pd.DataFrame([counts for _, counts in history],
+                             index=[day for day, _ in history]
+                             ).rename(columns=texts.status_names)
+        st.line_chart(trend)
+
+
+@st.fragment
+def word_detail_panel(workbook, word_info, selected_index, lang,
+                      read_only=False):
+    """単語詳細・ステータス更新・例文パネル
+
+    フラグメントとして独立して再実行されるため、ステータス選択などの
+    操作で全単語リストの再構築は行われない。
+    """
+    texts = get_bundle(lang)
+    selected_word = word_info['Word']
+
+    st.markdown("---")
+    example_text = texts['example_sentences_for']
+    st.markdown(f"{example_text} **{selected_word}**")
+    section = word_info['Section']
+    example_no = word_info['example_no']
+
+    section_text = texts['section']
+    example_no_display = example_no if example_no is not None else '?'
+    info_text = f"**{section_text}:** {section}-{example_no_display}"
+
+    # 単語情報とステータス更新を横並びに配置
+    col_info, col_status = st.columns(
+        [1, 2], vertical_alignment='bottom')
+
+    with col_info:
+        st.markdown(info_text)
+
+    with col_status:
+        render_status_update(workbook, word_info, selected_index, lang,
+                             read_only)
+
+    render_example_sentences(word_info, lang)
+
+
 def main():
     """メイン関数"""
+    setup_logging()
+
     # 言語設定をサイドバーに追加
     with st.sidebar:
         st.header("Settings")
@@ -89,59 +416,128 @@ def main():
             index=0,  # デフォルトは英語
             help="Select your preferred language"
         )
+        texts = get_bundle(selected_lang)
+
+        # ワークブック（複数設定されている場合のみ選択肢を表示）
+        workbooks = get_workbooks()
+        if len(workbooks) > 1:
+            workbook_id = st.selectbox(
+                texts['workbook_setting'],
+                options=list(workbooks),
+                format_func=lambda x: workbooks[x].name,
+                help=texts['workbook_help'],
+                key="workbook_id",
+                on_change=on_workbook_change
+            )
+        else:
+            workbook_id = next(iter(workbooks))
+        workbook = workbooks[workbook_id]
+
+        st.button(texts['refresh_workbooks'],
+                  help=texts['refresh_workbooks_help'],
+                  on_click=on_refresh_workbooks,
+                  args=(selected_lang,))
 
     st.set_page_config(
-        page_title=get_text('page_title', selected_lang),
+        page_title=texts['page_title'],
         page_icon="📚",
         layout="wide"
     )
 
-    st.title(get_text('app_title', selected_lang))
+    st.title(texts['app_title'])
 
     # Notion接続テスト
     try:
         get_notion_client()
     except Exception as e:
-        st.error(f"{get_text('notion_api_error', selected_lang)} {e}")
+        st.error(f"{texts['notion_api_error']} {e}")
         return
 
     # データを取得
-    st.toast(get_text('loading_words', selected_lang), icon="📚")
-    words_data = get_words_data()
+    st.toast(texts['loading_words'], icon="📚")
+    budget = LatencyBudget(RERUN_LATENCY_BUDGET)
+    snapshot, read_only, loading = load_words_snapshot(workbook, budget)
 
-    if not words_data:
-        st.warning(get_text('no_data_found', selected_lang))
+    if snapshot is None and loading:
+        # 大きなワークブックの初回取得は続けたまま、次の再実行で待ち直す
+        st.info(texts['loading_in_background'])
+        st.rerun()
+
+    if snapshot is None or not snapshot.records:
+        st.warning(texts['no_data_found'])
         return
 
-    # DataFrameに変換
-    df = pd.DataFrame(words_data)
+    # 取得が遅い・Notionに接続できない間は最後に取得したデータを
+    # 読み取り専用で表示
+    if read_only:
+        fetched_at = time.strftime('%Y-%m-%d %H:%M:%S',
+                                   time.localtime(snapshot.fetched_at))
+        message = (texts['refreshing_in_background'] if loading
+                   else texts['read_only_mode'])
+        st.warning(f"{message} ({texts['last_updated']} {fetched_at})")
+
+    table = get_word_table(workbook, snapshot)
+    sorted_df, word_options, word_index = (table.sorted_df, table.options,
+                                           table.index)
 
     # 単語選択と例文表示
-    if not df.empty:
-        st.header(get_text('unmastered_words_header', selected_lang))
-        word_count = len(df)
-        words_found_text = get_text('words_found', selected_lang)
+    if word_index.count:
+        st.header(texts['unmastered_words_header'])
+        word_count = word_index.count
+        words_found_text = texts['words_found']
         st.markdown(f"**{word_count}** {words_found_text}")
+        render_refresh_summary(workbook, selected_lang)
+        render_fetch_timings(snapshot, selected_lang)
+
+        with st.expander(texts['progress_header']):
+            render_progress_dashboard(workbook, selected_lang)
+
+        # 検索・絞り込み（インデックスで検索し、1ページ分だけを選択肢にする）
+        all_text = texts['all']
+        col_search, col_section, col_status = st.columns([2, 1, 1])
+
+        with col_search:
+            query = st.text_input(
+                texts['search_word'],
+                help=texts['search_word_help'],
+                key="word_search",
+                on_change=on_search_change
+            )
 
-        # ソート済みのリストを作成
-        sorted_df = df.sort_values(['Section'])
-
-        # 単語選択
-        word_options = []
-        for _, row in sorted_df.iterrows():
-            section = row['Section'] if row['Section'] is not None else '?'
-            example_no = row['example_no'] if row['example_no'] is not None else '?'
-            word = row['Word']
-            status = row['Status'] if row['Status'] else 'Unknown'
-            status_emoji = get_status_emoji(status)
-            display_text = f"Section {section}-{example_no}: {status_emoji} {word}"
-            word_options.append(display_text)
-
-        # デフォルトインデックスを決定
-        default_index = st.session_state.get('selected_word_index', 0)
-        # 範囲チェック
-        if default_index >= len(word_options):
-            default_index = 0
+        with col_section:
+            section_filter = st.selectbox(
+                texts['section'],
+                options=[None] + word_index.sections,
+                format_func=lambda x: all_text if x is None else str(x),
+                key="word_section_filter",
+                on_change=on_search_change
+            )
+
+        with col_status:
+            status_filter = st.selectbox(
+                texts['status'],
+                options=[None] + ALL_STATUSES,
+                format_func=lambda x: (all_text if x is None
+                                       else texts.status_label(x)),
+                key="word_status_filter",
+                on_change=on_search_change
+            )
+
+        page = st.session_state.get('word_search_page', 1)
+        result = word_index.search(query, section_filter, status_filter,
+                                   page=page - 1, page_size=WORD_PAGE_SIZE)
+        # 範囲外のページ番号を補正
+        st.session_state.word_search_page = result.page + 1
+
+        if not result.rows:
+            st.info(texts['no_matching_words'])
+            return
+
+        # 選択中の単語が現在のページにない場合は先頭の単語を選択
+        selected_row = st.session_state.get('selected_word_index')
+        if selected_row not in result.rows:
+            selected_row = result.rows[0]
+        st.session_state.word_selectbox_index = selected_row
 
         # ランダム選択ボタンを追加
         col1, col2 = st.columns([1, 1], vertical_alignment='bottom')
@@ -149,11 +545,10 @@ def main():
         # 単語選択用のselectbox
         with col1:
             selected_index = st.selectbox(
-                get_text('select_word', selected_lang),
-                options=range(len(word_options)),
+                texts['select_word'],
+                options=result.rows,
                 format_func=lambda x: word_options[x],
-                index=default_index,
-                help=get_text('select_word_help', selected_lang),
+                help=texts['select_word_help'],
                 key="word_selectbox_index",
                 on_change=on_word_selection_change
             )
@@ -162,104 +557,37 @@ def main():
             st.session_state.selected_word_index = selected_index
 
         with col2:
-            if st.button(get_text('pick_one_button', selected_lang),
-                         help=get_text('pick_one_help', selected_lang),
-                         use_container_width=True):
-                random_index = random.randint(0, len(word_options) - 1)
-                st.session_state.selected_word_index = random_index
-                st.session_state.selection_changed = True
-                st.rerun()
+            st.button(texts['pick_one_button'],
+                      help=texts['pick_one_help'],
+                      use_container_width=True,
+                      on_click=on_pick_one,
+                      args=(word_index, query, section_filter,
+                            status_filter))
+
+        # ページ送り
+        if result.page_count > 1:
+            col_page, col_count = st.columns([1, 3],
+                                             vertical_alignment='bottom')
+            with col_page:
+                st.number_input(
+                    texts['page'],
+                    min_value=1,
+                    max_value=result.page_count,
+                    step=1,
+                    key="word_search_page"
+                )
+            with col_count:
+                matching_text = texts['matching_words']
+                st.caption(f"{result.total} {matching_text} "
+                           f"({result.page + 1}/{result.page_count})")
 
         if selected_index is not None and selected_index < len(word_options):
             # 選択された単語の情報を取得
             word_info = sorted_df.iloc[selected_index]
-            selected_word = word_info['Word']
-
-            st.markdown("---")
-            example_text = get_text('example_sentences_for', selected_lang)
-            st.markdown(f"{example_text} **{selected_word}**")
-            section = word_info['Section']
-            example_no = word_info['example_no']
-            status = word_info['Status']
-            status_emoji = get_status_emoji(status)
-
-            section_text = get_text('section', selected_lang)
-            example_no_display = example_no if example_no is not None else '?'
-            info_text = f"**{section_text}:** {section}-{example_no_display}"
-
-            # 単語情報とステータス更新を横並びに配置
-            col_info, col_status = st.columns(
-                [1, 2], vertical_alignment='bottom')
-
-            with col_info:
-                st.markdown(info_text)
-
-            with col_status:
-                # 現在のステータスを含むすべての選択肢を作成
-                all_statuses = ['Not Sure', 'Seen It',
-                                'Almost There', 'Mastered']
-
-                # 現在のステータスのインデックスを取得
-                try:
-                    current_index = all_statuses.index(status)
-                except ValueError:
-                    current_index = 0
-
-                # selectboxリセットフラグをチェック
-                if st.session_state.get('reset_selectbox', False):
-                    # リセットフラグをクリア
-                    st.session_state.reset_selectbox = False
-                    # selectboxのキーをリセットして再描画を促す
-                    selectbox_key = f"status_update_{selected_index}"
-                    if selectbox_key in st.session_state:
-                        del st.session_state[selectbox_key]
-
-                new_status = st.selectbox(
-                    get_text('update_status', selected_lang),
-                    options=all_statuses,
-                    index=current_index,
-                    help=get_text('update_status_help', selected_lang),
-                    key=f"status_update_{selected_index}"
-                )
-
-                # 現在のステータスと異なる場合、確認ダイアログを表示
-                if (new_status != status and
-                        not st.session_state.get('show_dialog', False)):
-                    # ダイアログ表示フラグを設定
-                    st.session_state.show_dialog = True
-                    page_id = word_info['page_id']
-                    show_confirmation_dialog(
-                        status, new_status, page_id, selected_lang)
-
-            # 例文を表示（rollupから取得した例文を使用）
-            try:
-                example_sentence = word_info.get('example_sentence', '')
-
-                if example_sentence:
-                    # 改行で分割して行ごとに処理
-                    lines = (example_sentence.replace('\r\n', '\n')
-                             .replace('\r', '\n')
-                             .split('\n'))
-
-                    # 例文ブロックを開始
-                    style = ("font-size: 18px; line-height: 1.6; "
-                             "margin-bottom: 16px")
-
-                    for line in lines:
-                        # 各行の余分な空白を除去
-                        cleaned_line = ' '.join(line.split())
-                        if cleaned_line:  # 空行でない場合のみ表示
-                            div = (f'<div style="{style};">'
-                                   f'{cleaned_line}</div>')
-                            st.markdown(div, unsafe_allow_html=True)
-                else:
-                    st.info(get_text('no_example_sentences', selected_lang))
-
-            except Exception as e:
-                error_msg = get_text('sentence_fetch_error', selected_lang)
-                st.error(f"{error_msg} {e}")
+            word_detail_panel(workbook, word_info, selected_index,
+                              selected_lang, read_only)
     else:
-        st.info(get_text('no_unmastered_words', selected_lang))
+        st.info(texts['no_unmastered_words'])
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ Integration接続テスト
 import os
 from dotenv import load_dotenv
 from notion_client import Client
+from notion_client.helpers import collect_paginated_api
 
 load_dotenv()
 
@@ -32,12 +33,12 @@ def test_integration():
             name = user.get('name', 'Unknown')
             print(f"- {name} ({user_type})")
 
-        # 検索可能なすべてのオブジェクト
+        # 検索可能なすべてのオブジェクト（検索結果を最後までたどる）
         print("\n=== 検索可能なオブジェクト ===")
-        all_results = notion.search()
-        print(f"アクセス可能なオブジェクト数: {len(all_results['results'])}")
+        all_results = collect_paginated_api(notion.search)
+        print(f"アクセス可能なオブジェクト数: {len(all_results)}")
 
-        if not all_results['results']:
+        if not all_results:
             print("❌ アクセス可能なページやデータベースがありません")
             print("📝 解決方法:")
             print("1. Notionでページまたはデータベースを作成")
@@ -45,7 +46,7 @@ def test_integration():
             print("3. Integration名は大文字小文字を正確に入力")
         else:
             print("✅ 以下のオブジェクトにアクセス可能:")
-            for obj in all_results['results']:
+            for obj in all_results:
                 obj_type = obj.get('object', 'unknown')
                 obj_id = obj.get('id', 'unknown')
                 print(f"- {obj_type}: {obj_id}")
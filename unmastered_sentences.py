@@ -5,22 +5,35 @@ Sentences データベースの Unmastered words フィルタリング
 
 import os
 from dotenv import load_dotenv
-from notion_client import Client
+
+from src.wordbook.async_notion import NotionFacade
+from src.wordbook.workbooks import get_workbook
 
 load_dotenv()
 
 
-def get_unmastered_sentences():
+def get_unmastered_sentences(workbook_id=None):
     """Unmastered wordsに値があるSentencesを取得"""
-    notion_token = os.getenv("NOTION_TOKEN")
-    notion = Client(auth=notion_token)
+    # Sentences データベースID（ワークブック未指定なら最初のワークブック）
+    workbook = get_workbook(workbook_id or os.getenv("WORDBOOK_ID"))
+    sentences_db_id = workbook.sentences_db_id
+    if not sentences_db_id:
+        print(f"エラー: {workbook.id} にSentencesデータベースが設定されていません")
+        return
 
-    # Sentences データベースID
-    sentences_db_id = "2230dc53-a13b-8055-9c36-cbe6162846ef"
+    notion_token = os.getenv("NOTION_TOKEN")
+    notion = NotionFacade(auth=notion_token)
 
     try:
-        # まず、データベースの構造を確認
-        database = notion.databases.retrieve(database_id=sentences_db_id)
+        # データベースの構造とレコード（最初の20件）を並行して取得
+        database, query_result = notion.gather(
+            notion.request('databases.retrieve', database_id=sentences_db_id),
+            notion.request(
+                'databases.query',
+                database_id=sentences_db_id,
+                page_size=20
+            )
+        )
 
         print("=== Sentences データベース構造 ===")
         print("プロパティ:")
@@ -29,13 +42,6 @@ def get_unmastered_sentences():
             print(f"  - {prop_name}: {prop_type}")
 
         print("\n=== 全レコード取得（最初の20件）===")
-
-        # 全レコードを取得して内容を確認
-        query_result = notion.databases.query(
-            database_id=sentences_db_id,
-            page_size=20
-        )
-
         print(f"取得したレコード数: {len(query_result['results'])}")
 
         unmastered_sentences = []
@@ -136,6 +142,8 @@ def get_unmastered_sentences():
         print(f"エラー: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        notion.close()
 
 
 if __name__ == "__main__":